@@ -1,69 +1,112 @@
+import importlib.util
+import logging
 import os
+import re
 from datetime import timedelta
 
 POSTGRES_SCHEME = 'postgres://'
 POSTGRESQL_SCHEME = 'postgresql://'
 
+logger = logging.getLogger(__name__)
+
+# Matches the "user:password@" credentials portion of a database URI
+_URI_CREDENTIALS_RE = re.compile(r'://[^@/]+@')
+
+# Resolved once per process so repeated create_app() calls skip the filesystem probe
+_CONFIG_MODULE = (
+    'App.custom_config'
+    if importlib.util.find_spec('App.custom_config') is not None
+    else 'App.default_config'
+)
+
+# Settings that never vary between app instances; applied with a single update()
+_STATIC_CONFIG = {
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    'TEMPLATES_AUTO_RELOAD': True,
+    'PREFERRED_URL_SCHEME': 'https',
+    'UPLOADED_PHOTOS_DEST': "App/static/uploads",
+    # JWT Configuration
+    'JWT_ACCESS_TOKEN_EXPIRES': timedelta(hours=1),
+    'JWT_ACCESS_COOKIE_NAME': 'access_token',
+    'JWT_TOKEN_LOCATION': ("cookies", "headers"),
+    # Legacy routes keep insecure settings for backward compatibility
+    'JWT_COOKIE_SECURE_LEGACY': False,
+    'JWT_COOKIE_CSRF_PROTECT_LEGACY': False,
+    'FLASK_ADMIN_SWATCH': 'darkly',
+}
+
+# Environment variables checked for the database URI, first non-empty wins
+_DB_URL_ENV_KEYS = (
+    'DATABASE_URI_NEON',
+    'DATABASE_URI_SQLITE',
+    'DATABASE_URI_POSTGRES_LOCAL',
+    'DATABASE_URL',
+)
+
+def _collect_db_url():
+    """Return the first database URI found in the environment."""
+    env = os.environ
+    return next((value for key in _DB_URL_ENV_KEYS if (value := env.get(key))), None)
+
+def _normalize_pg_scheme(url):
+    """Rewrite the legacy postgres:// scheme to the postgresql:// form SQLAlchemy expects."""
+    if url.startswith(POSTGRES_SCHEME):
+        return POSTGRESQL_SCHEME + url[len(POSTGRES_SCHEME):]
+    return url
+
+def _mask(url):
+    """Hide credentials in a database URI before it is logged."""
+    return _URI_CREDENTIALS_RE.sub('://***@', url)
+
 def load_config(app, overrides):
-    if os.path.exists(os.path.join('./App', 'custom_config.py')):
-        app.config.from_object('App.custom_config')
-    else:
+    env = os.environ
+    try:
+        app.config.from_object(_CONFIG_MODULE)
+    except ImportError:
         app.config.from_object('App.default_config')
     
     app.config.from_prefixed_env()
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
-    app.config['PREFERRED_URL_SCHEME'] = 'https'
-    app.config['UPLOADED_PHOTOS_DEST'] = "App/static/uploads"
+    app.config.update(_STATIC_CONFIG)
     
-    db_url = (
-        os.environ.get('DATABASE_URI_NEON') or
-        os.environ.get('DATABASE_URI_SQLITE') or
-        os.environ.get('DATABASE_URI_POSTGRES_LOCAL') or
-        app.config.get('SQLALCHEMY_DATABASE_URI')
-    )
+    db_url = _collect_db_url() or app.config.get('SQLALCHEMY_DATABASE_URI')
     if db_url:
-        if db_url.startswith(POSTGRES_SCHEME):
-            db_url = db_url.replace(POSTGRES_SCHEME, POSTGRESQL_SCHEME, 1)
+        db_url = _normalize_pg_scheme(db_url)
         app.config['SQLALCHEMY_DATABASE_URI'] = db_url
-        print(f"Using database URI: {db_url}")
+        logger.info('Using database URI: %s', _mask(db_url))
     else:
-        print("Warning: No database URI configured")
+        logger.warning('No database URI configured')
 
-    # JWT Configuration
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-    app.config['JWT_ACCESS_COOKIE_NAME'] = 'access_token'
-    app.config["JWT_TOKEN_LOCATION"] = ["cookies", "headers"]
-    
     # Secure JWT settings for production (API v2 routes will enforce these)
-    is_production = os.environ.get('ENV', 'development') == 'production'
+    is_production = env.get('ENV', 'development') == 'production'
     app.config["JWT_COOKIE_SECURE"] = is_production  # True in production, False in development
     app.config["JWT_COOKIE_CSRF_PROTECT"] = is_production  # True in production, False in development
     
-    # Legacy routes keep insecure settings for backward compatibility
-    app.config["JWT_COOKIE_SECURE_LEGACY"] = False
-    app.config["JWT_COOKIE_CSRF_PROTECT_LEGACY"] = False
-    
     app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
     
-    app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
-    
-    for key in overrides:
-        app.config[key] = overrides[key]
+    app.config.update(overrides)
 
     # Normalize DB URI if overrides replaced it (e.g., postgres scheme)
     final_db_uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
     if final_db_uri.startswith(POSTGRES_SCHEME):
-        final_db_uri = final_db_uri.replace(POSTGRES_SCHEME, POSTGRESQL_SCHEME, 1)
+        final_db_uri = _normalize_pg_scheme(final_db_uri)
         app.config['SQLALCHEMY_DATABASE_URI'] = final_db_uri
 
     # Ensure SQLAlchemy re-establishes dropped connections (e.g., idle Postgres SSL timeouts)
     engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    # Room for every distinct ORM statement the app issues, so repeat queries skip SQL compilation
+    engine_options.setdefault('query_cache_size', 1200)
     if final_db_uri.startswith('sqlite'):
         # SQLite doesn't use the connection pool in the same way; avoid pool options that break tests
-        for key in ('pool_pre_ping', 'pool_recycle', 'pool_timeout'):
+        for key in ('pool_pre_ping', 'pool_recycle', 'pool_timeout', 'pool_size', 'max_overflow'):
             engine_options.pop(key, None)
     else:
         engine_options.setdefault('pool_pre_ping', True)
         engine_options.setdefault('pool_recycle', 280)
-        engine_options.setdefault('pool_timeout', 30)
\ No newline at end of file
+        engine_options.setdefault('pool_timeout', 30)
+        # Each gevent worker serves many requests at once; each holds a connection only for its own session
+        engine_options.setdefault('pool_size', 10)
+        engine_options.setdefault('max_overflow', 20)
+        if final_db_uri.startswith((POSTGRESQL_SCHEME, 'postgresql+psycopg2://')):
+            # Send executemany INSERTs as multi-row VALUES and UPDATE/DELETE batches
+            # through execute_batch, so bulk seeding is one round trip per page
+            engine_options.setdefault('executemany_mode', 'values_plus_batch')
@@ -1,8 +1,9 @@
 from App.models import Admin
 from App.database import db
 
-def create_admin(username, password, role):
+def create_admin(username, password, role, commit=True):
     new_admin = Admin(username, password, role)
     db.session.add(new_admin)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_admin
@@ -4,13 +4,33 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def create_allocation(username, schedule, shift):
+def create_allocation(username, schedule, shift, commit=True):
     new_allocation = Allocation(username, schedule, shift)
     db.session.add(new_allocation)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_allocation
 
 
+def bulk_create_allocations(rows, commit=True):
+    """
+    Insert many allocations in one executemany, bypassing the ORM unit of work.
+    
+    Args:
+        rows: Iterable of dicts with username, shift_id and schedule_id keys
+        commit: Commit the transaction after inserting (default True)
+    
+    Returns:
+        Number of allocation rows inserted
+    """
+    rows = list(rows)
+    if rows:
+        db.session.bulk_insert_mappings(Allocation, rows)
+        if commit:
+            db.session.commit()
+    return len(rows)
+
+
 def remove_staff_from_shift(staff_id, day=None, time_slot=None, shift_id=None):
     """
     Remove a staff member from a shift
@@ -72,11 +92,13 @@ def assign_staff_to_shift(staff_id, shift_id):
         Dictionary with status and message
     """
     try:
-        # Check if allocation already exists
-        existing = Allocation.query.filter_by(
-            shift_id=shift_id,
-            username=staff_id
-        ).first()
+        # Check if allocation already exists (SELECT EXISTS, no row hydration)
+        existing = db.session.query(
+            db.session.query(Allocation.id).filter_by(
+                shift_id=shift_id,
+                username=staff_id
+            ).exists()
+        ).scalar()
         
         if existing:
             return {
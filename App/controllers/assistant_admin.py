@@ -6,11 +6,13 @@ from App.models import Student, HelpDeskAssistant, LabAssistant, TimeEntry, User
 
 def _is_assistant(username: str) -> bool:
     """Return True if the username corresponds to any assistant type."""
-    if HelpDeskAssistant.query.get(username):
-        return True
-    if LabAssistant.query.get(username):
-        return True
-    return False
+    assistant = (
+        db.session.query(HelpDeskAssistant.username)
+        .filter_by(username=username)
+        .union_all(db.session.query(LabAssistant.username).filter_by(username=username))
+        .first()
+    )
+    return assistant is not None
 
 
 def delete_assistant_fully(username: str) -> Tuple[bool, Dict[str, Any]]:
@@ -26,11 +28,11 @@ def delete_assistant_fully(username: str) -> Tuple[bool, Dict[str, Any]]:
       (success, payload) where payload contains message or error details.
     """
     try:
-        user: Optional[User] = User.query.get(username)
+        user: Optional[User] = db.session.get(User, username)
         if user and user.is_admin():
             return False, {"message": "Cannot delete an admin user", "code": 400}
 
-        student: Optional[Student] = Student.query.get(username)
+        student: Optional[Student] = db.session.get(Student, username)
         if not student:
             return False, {"message": "Student not found", "code": 404}
 
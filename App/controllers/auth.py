@@ -1,8 +1,10 @@
 from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request
+from flask import g
 from App.models import User
+from App.database import db
 
 def login(username, password):
-    user = User.query.filter_by(username=username).first()
+    user = db.session.get(User, username)
     if user and user.check_password(password):
         access_token = create_access_token(
             identity=str(username),
@@ -21,20 +23,24 @@ def setup_jwt(app):
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
         identity = jwt_data["sub"]
-        return User.query.filter_by(username=identity).first()
+        return db.session.get(User, identity)
 
     return jwt
 
 def add_auth_context(app):
     @app.context_processor
     def inject_user():
+        # Resolve the user once per request; partial renders reuse it
+        if 'current_user' in g:
+            current_user = g.current_user
+            return dict(is_authenticated=current_user is not None, current_user=current_user)
         try:
-            verify_jwt_in_request()
+            # optional=True returns quietly when no token is present instead of raising
+            verify_jwt_in_request(optional=True)
             identity = get_jwt_identity()
-            current_user = User.query.filter_by(username=identity).first()
-            is_authenticated = True if current_user else False
+            current_user = db.session.get(User, identity) if identity is not None else None
         except Exception as e:
             print(f"Auth context error: {e}")
-            is_authenticated = False
             current_user = None
-        return dict(is_authenticated=is_authenticated, current_user=current_user)
\ No newline at end of file
+        g.current_user = current_user
+        return dict(is_authenticated=current_user is not None, current_user=current_user)
@@ -1,15 +1,32 @@
 from App.models import Availability, Student, HelpDeskAssistant, LabAssistant
 from App.database import db
 from datetime import datetime, time
+import functools
 import logging
+import re
 from App.utils.profile_images import resolve_profile_image
 
 logger = logging.getLogger(__name__)
 
-def create_availability(username, day_of_week, start_time, end_time):
+# "9:00 am", "1 PM", "14:00", "09:00:00" -> hour digits + optional meridiem.
+# Only the leading time is matched, so ranges such as "09:00 AM to 10:00 AM" give their start hour
+_TIME_SLOT_RE = re.compile(r'^\s*(\d{1,2})(?!\d)(?::\d{2}){0,2}\s*([ap]m)?\s*(?:$|-|to\b)', re.IGNORECASE)
+
+_DAY_INDEX = {
+    'monday': 0,
+    'tuesday': 1,
+    'wednesday': 2,
+    'thursday': 3,
+    'friday': 4,
+    'saturday': 5,
+    'sunday': 6
+}
+
+def create_availability(username, day_of_week, start_time, end_time, commit=True):
     new_availability = Availability(username, day_of_week, start_time, end_time)
     db.session.add(new_availability)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_availability
 
 
@@ -35,25 +52,29 @@ def get_available_staff_for_time(day, time_slot):
         if day_index is None:
             return []
         
-        # Query available staff for this day and time
-        available_staff = db.session.query(Availability).filter(
+        # Query available staff with their student details in one round-trip
+        available_staff = db.session.query(
+            Availability.username,
+            Student.name,
+            Student.profile_data
+        ).join(
+            Student, Student.username == Availability.username
+        ).filter(
             Availability.day_of_week == day_index,
             Availability.start_time <= time(hour, 0),
             Availability.end_time > time(hour, 0)
         ).all()
         
         # Build staff list with details
-        staff_list = []
-        for availability in available_staff:
-            # Get staff details from student/assistant tables
-            student = Student.query.filter_by(username=availability.username).first()
-            if student:
-                staff_list.append({
-                    "id": availability.username,
-                    "name": student.name or availability.username,
-                    "type": "student",
-                    "profile_image_url": resolve_profile_image(student.profile_data)
-                })
+        staff_list = [
+            {
+                "id": username,
+                "name": name or username,
+                "type": "student",
+                "profile_image_url": resolve_profile_image(profile_data)
+            }
+            for username, name, profile_data in available_staff
+        ]
         
         return staff_list
         
@@ -104,93 +125,118 @@ def batch_check_staff_availability(queries):
     """
     Check availability for multiple staff/time combinations
     
+    All availability windows for the requested staff are fetched in a single
+    query and each combination is answered from an in-memory set.
+    
     Args:
         queries: List of query objects with staff_id, day, time
     
     Returns:
         List of results with availability status
     """
-    results = []
+    # Column-wise (struct-of-arrays) view of the queries: one pass per field
+    staff_ids = [query.get('staff_id') for query in queries]
+    days = [query.get('day') for query in queries]
+    time_slots = [query.get('time') for query in queries]
     
-    for query in queries:
+    day_indices = []
+    hours = []
+    errors = {}
+    for position, (staff_id, day, time_slot) in enumerate(zip(staff_ids, days, time_slots)):
+        day_index = hour = None
+        if staff_id and day and time_slot:
+            try:
+                day_index = _get_day_index(day)
+                hour = _parse_time_slot_to_hour(time_slot)
+            except Exception as e:
+                logger.error(f"Error in batch availability check for query {queries[position]}: {e}")
+                errors[position] = str(e)
+        day_indices.append(day_index)
+        hours.append(hour)
+    
+    lookup_staff = set()
+    lookup_days = set()
+    for staff_id, day_index, hour in zip(staff_ids, day_indices, hours):
+        if day_index is not None and hour is not None:
+            lookup_staff.add(staff_id)
+            lookup_days.add(day_index)
+    
+    available = set()
+    if lookup_staff:
         try:
-            staff_id = query.get('staff_id')
-            day = query.get('day')
-            time_slot = query.get('time')
-            
-            if not all([staff_id, day, time_slot]):
-                continue
-            
-            is_available = check_staff_availability_for_time(staff_id, day, time_slot)
-            
-            results.append({
-                "staff_id": staff_id,
-                "day": day,
-                "time": time_slot,
-                "is_available": is_available
-            })
+            rows = db.session.query(
+                Availability.username,
+                Availability.day_of_week,
+                Availability.start_time,
+                Availability.end_time
+            ).filter(
+                Availability.username.in_(lookup_staff),
+                Availability.day_of_week.in_(lookup_days)
+            ).all()
             
+            for username, day_of_week, start_time, end_time in rows:
+                for hour in _hours_covered(start_time, end_time):
+                    available.add((username, day_of_week, hour))
+                    
         except Exception as e:
-            logger.error(f"Error in batch availability check for query {query}: {e}")
-            results.append({
-                "staff_id": query.get('staff_id'),
-                "day": query.get('day'),
-                "time": query.get('time'),
-                "is_available": False,
-                "error": str(e)
-            })
+            logger.error(f"Error in batch availability check for {len(lookup_staff)} staff: {e}")
+    
+    results = []
+    for position, (staff_id, day, time_slot, day_index, hour) in enumerate(
+        zip(staff_ids, days, time_slots, day_indices, hours)
+    ):
+        if not (staff_id and day and time_slot):
+            continue
+        
+        result = {
+            "staff_id": staff_id,
+            "day": day,
+            "time": time_slot,
+            "is_available": (staff_id, day_index, hour) in available
+        }
+        if position in errors:
+            result["is_available"] = False
+            result["error"] = errors[position]
+        results.append(result)
     
     return results
 
 
+def _hours_covered(start_time, end_time):
+    """Hours h for which start_time <= h:00 < end_time"""
+    first = start_time.hour + (1 if (start_time.minute or start_time.second or start_time.microsecond) else 0)
+    last = end_time.hour + (1 if (end_time.minute or end_time.second or end_time.microsecond) else 0)
+    return range(first, last)
+
+
+@functools.lru_cache(maxsize=128)
 def _parse_time_slot_to_hour(time_slot):
-    """Parse time slot string to hour integer"""
-    try:
-        # Handle common formats
-        time_slot = time_slot.lower().strip()
-        
-        # Remove "am" or "pm"
-        if 'am' in time_slot or 'pm' in time_slot:
-            is_pm = 'pm' in time_slot
-            time_part = time_slot.replace('am', '').replace('pm', '').strip()
-            
-            # Extract hour
-            if ':' in time_part:
-                hour = int(time_part.split(':')[0])
-            else:
-                hour = int(time_part)
-            
-            # Convert to 24-hour format
-            if is_pm and hour != 12:
-                hour += 12
-            elif not is_pm and hour == 12:
-                hour = 0
-                
-            return hour
-        else:
-            # Assume 24-hour format
-            if ':' in time_slot:
-                return int(time_slot.split(':')[0])
-            else:
-                return int(time_slot)
-                
-    except (ValueError, IndexError):
+    """Parse time slot string to hour integer
+
+    Results are cached, so the parse error for a bad string is only logged the first time it is seen.
+    """
+    match = _TIME_SLOT_RE.match(time_slot)
+    hour = int(match.group(1)) if match else None
+    meridiem = match.group(2) if match else None
+    if hour is None or hour > 23 or (meridiem is not None and hour > 12):
         logger.error(f"Could not parse time slot: {time_slot}")
         return None
+    
+    if meridiem is None:
+        # Assume 24-hour format
+        return hour
+    
+    # Convert to 24-hour format
+    is_pm = meridiem.lower() == 'pm'
+    if is_pm and hour != 12:
+        hour += 12
+    elif not is_pm and hour == 12:
+        hour = 0
+    
+    return hour
 
 
+@functools.lru_cache(maxsize=128)
 def _get_day_index(day):
     """Convert day name to index (0=Monday, 6=Sunday)"""
-    day_mapping = {
-        'monday': 0,
-        'tuesday': 1,
-        'wednesday': 2,
-        'thursday': 3,
-        'friday': 4,
-        'saturday': 5,
-        'sunday': 6
-    }
-    
-    return day_mapping.get(day.lower())
-
-
+    return _DAY_INDEX.get(day.lower())
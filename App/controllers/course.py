@@ -1,10 +1,11 @@
 from App.models import Course, CourseCapability
 from App.database import db
 
-def create_course(code, name):
+def create_course(code, name, commit=True):
     new_course = Course(code=code, name=name)
     db.session.add(new_course)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_course
 
 
@@ -28,19 +29,17 @@ def get_all_course_codes():
 
 # Helper function to get all courses as a dictionary
 def get_courses_dict():
-    courses = get_all_courses()
-    if courses:
-        return [course.get_json() for course in courses]
-    return []
+    return [course.get_json() for course in get_all_courses()]
 
 
 # Helper function to validate a course code
 def is_valid_course(course_code):
-    return course_code in get_all_course_codes()
+    return db.session.query(Course.code).filter_by(code=course_code).first() is not None
 
 
-def create_course_capability(username, code):
+def create_course_capability(username, code, commit=True):
     new_course = CourseCapability(assistant_username=username, course_code=code)
     db.session.add(new_course)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_course
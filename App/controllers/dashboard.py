@@ -4,15 +4,28 @@ from App.middleware import volunteer_required
 from App.models import Student, HelpDeskAssistant, Shift, Allocation, TimeEntry
 from App.database import db
 from datetime import datetime, timedelta
+import logging
+from sqlalchemy import bindparam, case, select
 from App.utils.time_utils import trinidad_now, convert_to_trinidad_time
+from App.utils.fastfmt import fmt_long_date, fmt_shift_date, fmt_shift_time_range
 from App.controllers.schedule import get_current_schedule
 from App.models import Schedule
 
+logger = logging.getLogger(__name__)
+
+# Dashboard grid rows (9am to 4pm) keyed by shift start hour
+_HOUR_TO_SLOT = {
+    9: '9:00 am', 10: '10:00 am', 11: '11:00 am', 12: '12:00 pm',
+    13: '1:00 pm', 14: '2:00 pm', 15: '3:00 pm', 16: '4:00 pm',
+}
+
 def get_dashboard_data(username):
     """Get all required data for the volunteer dashboard"""
+    logger.debug("Fetching dashboard data for user: %s", username)
+    
+    # Looked up once; the error fallback below reuses it instead of querying again
+    student = None
     try:
-        print(f"Fetching dashboard data for user: {username}")
-        
         # Get current date and time
         now = trinidad_now()
         today = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -20,25 +33,25 @@ def get_dashboard_data(username):
         # Get student info
         student = Student.query.get(username)
         if not student:
-            print(f"Student with username {username} not found")
+            logger.debug("Student with username %s not found", username)
             return None
         
-        print(f"Fetching next shift for {username}...")
+        logger.debug("Fetching next shift for %s...", username)
         # 1. Get the user's next scheduled shift
         next_shift = get_next_shift(username, now)
         
-        print(f"Fetching upcoming shifts for {username}...")
+        logger.debug("Fetching upcoming shifts for %s...", username)
         # 2. Get the user's upcoming shifts (my schedule section)
         my_shifts = get_my_upcoming_shifts(username, today)
         
-        print(f"Fetching full schedule...")
+        logger.debug("Fetching full schedule...")
         # 3. Get the full schedule from the same source used by the admin view
         
         schedule_data = get_current_schedule()
         
         # If no schedule exists, create a minimal structure
         if not schedule_data or not schedule_data.get('days'):
-            print("No published schedule found, using minimal structure")
+            logger.debug("No published schedule found, using minimal structure")
             full_schedule = {
                 'days_of_week': ['MON', 'TUE', 'WED', 'THUR', 'FRI'],
                 'time_slots': ['9:00 am', '10:00 am', '11:00 am', '12:00 pm', '1:00 pm', '2:00 pm', '3:00 pm', '4:00 pm'],
@@ -96,9 +109,10 @@ def get_dashboard_data(username):
             }
         
         # Log some useful debugging info
-        print(f"Dashboard data summary for {username}:")
-        print(f"- Next shift: {next_shift['date']} {next_shift['time'] if 'time' in next_shift else 'No time'}")
-        print(f"- Upcoming shifts: {len(my_shifts)}")
+        logger.debug(
+            "Dashboard data summary for %s: next shift %s %s, %d upcoming shifts",
+            username, next_shift['date'], next_shift.get('time', 'No time'), len(my_shifts)
+        )
         
         return {
             'student': student,
@@ -107,13 +121,11 @@ def get_dashboard_data(username):
             'full_schedule': full_schedule
         }
     except Exception as e:
-        print(f"Error getting dashboard data: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting dashboard data: %s", e)
         
         # Return at least a minimal set of valid data
         return {
-            'student': Student.query.get(username),
+            'student': student,
             'next_shift': {"date": "Error loading shifts", "time": "", "starts_now": False},
             'my_shifts': [],
             'full_schedule': {
@@ -126,39 +138,18 @@ def get_dashboard_data(username):
 def get_next_shift(username, now):
     """Get the next shift for this user"""
     try:
-        # Find the next scheduled shift for this user
-        # First check for an active shift (currently happening)
-        active_allocation = db.session.query(Allocation, Shift)\
-            .join(Shift, Allocation.shift_id == Shift.id)\
+        # Find the next scheduled shift for this user in one query: any shift that
+        # has not ended yet, with a currently active one sorted ahead of upcoming ones
+        shift = db.session.query(Shift)\
+            .join(Allocation, Allocation.shift_id == Shift.id)\
             .filter(
                 Allocation.username == username,
-                Shift.start_time <= now,
                 Shift.end_time >= now
             )\
+            .order_by(case((Shift.start_time <= now, 0), else_=1), Shift.start_time)\
             .first()
         
-        if active_allocation:
-            allocation, shift = active_allocation
-            
-            # Format the currently active shift
-            return {
-                "date": shift.date.strftime("%d %B, %Y"),
-                "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                "starts_now": True,
-                "time_until": ""
-            }
-        
-        # If no active shift, find the next upcoming shift
-        next_allocation = db.session.query(Allocation, Shift)\
-            .join(Shift, Allocation.shift_id == Shift.id)\
-            .filter(
-                Allocation.username == username,
-                Shift.start_time > now
-            )\
-            .order_by(Shift.start_time)\
-            .first()
-        
-        if not next_allocation:
+        if not shift:
             # No upcoming shifts found
             return {
                 "date": "No upcoming shifts",
@@ -167,7 +158,14 @@ def get_next_shift(username, now):
                 "time_until": ""
             }
         
-        allocation, shift = next_allocation
+        if shift.start_time <= now:
+            # Format the currently active shift
+            return {
+                "date": fmt_long_date(shift.date),
+                "time": fmt_shift_time_range(shift.start_time, shift.end_time),
+                "starts_now": True,
+                "time_until": ""
+            }
         
         # Calculate time until shift starts
         time_until = ""
@@ -186,16 +184,14 @@ def get_next_shift(username, now):
         
         # Format the next shift data
         return {
-            "date": shift.date.strftime("%d %B, %Y"),
-            "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
+            "date": fmt_long_date(shift.date),
+            "time": fmt_shift_time_range(shift.start_time, shift.end_time),
             "starts_now": False,
             "time_until": time_until
         }
         
     except Exception as e:
-        print(f"Error getting next shift: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting next shift: %s", e)
         return {
             "date": "No upcoming shifts",
             "time": "",
@@ -209,60 +205,47 @@ def get_my_upcoming_shifts(username, today):
         # Look ahead for the next 14 days to show more upcoming shifts
         next_two_weeks = today + timedelta(days=14)
         
-        # Get all published schedules first
-
-        published_schedules = Schedule.query.filter(
-            Schedule.is_published == True
-        ).order_by(Schedule.id.desc()).all()
-        
-        published_schedule_ids = [s.id for s in published_schedules]
+        # Flag each allocation's schedule as published in the same query, so the
+        # unpublished fallback needs no second round trip
+        in_published_schedule = Allocation.schedule_id.in_(
+            select(Schedule.id).where(Schedule.is_published == True)
+        ).label('in_published_schedule')
         
-        # Query allocations for this user from published schedules
-        allocations = db.session.query(Allocation, Shift)\
-            .join(Shift, Allocation.shift_id == Shift.id)\
+        rows = db.session.query(Shift, in_published_schedule)\
+            .join(Allocation, Allocation.shift_id == Shift.id)\
             .filter(
                 Allocation.username == username,
-                Allocation.schedule_id.in_(published_schedule_ids) if published_schedule_ids else False,
                 Shift.date >= today,
                 Shift.date <= next_two_weeks
             )\
             .order_by(Shift.date, Shift.start_time)\
             .all()
         
-        # If no allocations found in published schedules, try direct shift allocations
-        if not allocations:
-            print(f"No allocations in published schedules for {username}, trying direct shift allocations")
-            allocations = db.session.query(Allocation, Shift)\
-                .join(Shift, Allocation.shift_id == Shift.id)\
-                .filter(
-                    Allocation.username == username,
-                    Shift.date >= today,
-                    Shift.date <= next_two_weeks
-                )\
-                .order_by(Shift.date, Shift.start_time)\
-                .all()
+        # Prefer allocations from published schedules; otherwise show every direct allocation
+        shifts = [shift for shift, published in rows if published]
+        if not shifts:
+            logger.debug("No allocations in published schedules for %s, using direct shift allocations", username)
+            shifts = [shift for shift, _ in rows]
         
         # Format the shifts
         my_shifts = []
-        for allocation, shift in allocations:
+        for shift in shifts:
             try:
                 # Ensure shifts have date and time values before formatting
                 if shift.date and shift.start_time and shift.end_time:
                     my_shifts.append({
-                        "date": shift.date.strftime("%d %b"),
-                        "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
+                        "date": fmt_shift_date(shift.date),
+                        "time": fmt_shift_time_range(shift.start_time, shift.end_time)
                     })
             except Exception as e:
-                print(f"Error formatting shift: {e}")
+                logger.warning("Error formatting shift: %s", e)
                 continue
         
-        print(f"Found {len(my_shifts)} upcoming shifts for {username}")
+        logger.debug("Found %d upcoming shifts for %s", len(my_shifts), username)
         return my_shifts
         
     except Exception as e:
-        print(f"Error getting upcoming shifts: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting upcoming shifts: %s", e)
         return []
 
 def get_full_schedule(today):
@@ -270,91 +253,88 @@ def get_full_schedule(today):
     try:
         # Get the start of the week (Monday)
         start_of_week = today - timedelta(days=today.weekday())
-        end_of_week = start_of_week + timedelta(days=4)  # Just Mon-Fri
         
         # First, try to find the most recent published schedule
-        from App.models import Schedule
         latest_schedule = Schedule.query.filter(
             Schedule.is_published == True
         ).order_by(Schedule.id.desc()).first()
+        latest_schedule_id = latest_schedule.id if latest_schedule else None
         
-        # Prepare the staff schedule structure
-        days_of_week = ['MON', 'TUE', 'WED', 'THUR', 'FRI']
-        time_slots = ['9:00 am', '10:00 am', '11:00 am', '12:00 pm', '1:00 pm', '2:00 pm', '3:00 pm', '4:00 pm']
-        
-        # Initialize empty schedule grid
-        staff_schedule = {}
-        for time_slot in time_slots:
-            staff_schedule[time_slot] = {day: [] for day in days_of_week}
-        
-        # If we found a published schedule, use its shifts
-        if latest_schedule:
-            print(f"Found published schedule: Week {latest_schedule.week_number}")
-            
-            # Get all shifts for this schedule
-            shifts = Shift.query.filter_by(schedule_id=latest_schedule.id).all()
-        else:
-            # Fallback: Just get shifts for the current week if no published schedule exists
-            print("No published schedule found, using current week shifts")
-            shifts = Shift.query.filter(
-                Shift.date >= start_of_week,
-                Shift.date <= end_of_week
-            ).order_by(Shift.date, Shift.start_time).all()
-        
-        # Fill the schedule with actual data
-        for shift in shifts:
-            try:
-                # Get the day of week (if the shift has a valid date)
-                if shift.date:
-                    day_idx = shift.date.weekday()  # 0 = Monday, 4 = Friday
-                    if day_idx > 4:  # Skip weekends
-                        continue
-                        
-                    day = days_of_week[day_idx]
-                    
-                    # Get the time slot (round to the nearest hour)
-                    if shift.start_time:
-                        hour = shift.start_time.hour
-                        if hour >= 9 and hour < 17:  # 9am to 4pm
-                            # Map hour to time slot format
-                            if hour < 12:
-                                time_slot = f"{hour}:00 am"
-                            elif hour == 12:
-                                time_slot = "12:00 pm"
-                            else:
-                                time_slot = f"{hour-12}:00 pm"
-                            
-                            # Get assigned staff
-                            allocations = Allocation.query.filter_by(shift_id=shift.id).all()
-                            staff_names = []
-                            
-                            for allocation in allocations:
-                                student = Student.query.get(allocation.username)
-                                if student and student.name:
-                                    staff_names.append(student.name)
-                                else:
-                                    staff_names.append(allocation.username)
-                            
-                            # Add to schedule
-                            if time_slot in staff_schedule:
-                                staff_schedule[time_slot][day] = staff_names
-            except Exception as e:
-                print(f"Error processing shift {shift.id}: {e}")
-                continue
-        
-        return {
-            'days_of_week': days_of_week,
-            'time_slots': time_slots,
-            'staff_schedule': staff_schedule
-        }
+        return _build_full_schedule(latest_schedule_id, start_of_week)
     except Exception as e:
-        print(f"Error getting full schedule: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting full schedule: %s", e)
         
         # Return minimal valid structure
         return {
             'days_of_week': ['MON', 'TUE', 'WED', 'THUR', 'FRI'],
             'time_slots': ['9:00 am', '10:00 am', '11:00 am', '12:00 pm', '1:00 pm', '2:00 pm', '3:00 pm', '4:00 pm'],
             'staff_schedule': {}
-        }
\ No newline at end of file
+        }
+
+
+def _build_full_schedule(schedule_id, start_of_week):
+    """Staff grid for a published schedule, or for the shifts of the given week when schedule_id is None"""
+    end_of_week = start_of_week + timedelta(days=4)  # Just Mon-Fri
+    
+    # Prepare the staff schedule structure
+    days_of_week = ['MON', 'TUE', 'WED', 'THUR', 'FRI']
+    time_slots = ['9:00 am', '10:00 am', '11:00 am', '12:00 pm', '1:00 pm', '2:00 pm', '3:00 pm', '4:00 pm']
+    
+    # Initialize empty schedule grid
+    staff_schedule = {}
+    for time_slot in time_slots:
+        staff_schedule[time_slot] = {day: [] for day in days_of_week}
+    
+    # If we found a published schedule, use its shifts
+    if schedule_id is not None:
+        logger.debug("Found published schedule: %s", schedule_id)
+    else:
+        # Fallback: Just get shifts for the current week if no published schedule exists
+        logger.debug("No published schedule found, using current week shifts")
+    rows = _shifts_for_week(schedule_id, start_of_week, end_of_week)
+    
+    # Fill the schedule in a single pass; a later shift in the same cell replaces an earlier one
+    cell_shift_ids = {}
+    for shift_id, shift_date, start_time, username, name in rows:
+        if not shift_date or not start_time:
+            continue
+        
+        day_idx = shift_date.weekday()  # 0 = Monday, 4 = Friday
+        time_slot = _HOUR_TO_SLOT.get(start_time.hour)
+        if day_idx > 4 or not time_slot:  # Weekends and shifts outside 9am to 4pm
+            continue
+        
+        day = days_of_week[day_idx]
+        if cell_shift_ids.get((time_slot, day)) != shift_id:
+            cell_shift_ids[(time_slot, day)] = shift_id
+            staff_schedule[time_slot][day] = []
+        if username:
+            staff_schedule[time_slot][day].append(name or username)
+    
+    return {
+        'days_of_week': days_of_week,
+        'time_slots': time_slots,
+        'staff_schedule': staff_schedule
+    }
+
+
+def _grid_rows_statement(*criteria):
+    # One row per (shift, assigned student); shifts with nobody assigned still come back once
+    return select(Shift.id, Shift.date, Shift.start_time, Allocation.username, Student.name)\
+        .select_from(Shift)\
+        .outerjoin(Allocation, Allocation.shift_id == Shift.id)\
+        .outerjoin(Student, Student.username == Allocation.username)\
+        .where(*criteria)\
+        .order_by(Shift.date, Shift.start_time, Shift.id, Allocation.id)
+
+
+# Built once with bound parameters, so every render reuses the same two statements
+_SCHEDULE_GRID_ROWS = _grid_rows_statement(Shift.schedule_id == bindparam('schedule_id'))
+_WEEK_GRID_ROWS = _grid_rows_statement(Shift.date >= bindparam('start'), Shift.date <= bindparam('end'))
+
+
+def _shifts_for_week(schedule_id, start, end):
+    """Grid rows for a published schedule, or for the shifts dated start..end when schedule_id is None"""
+    if schedule_id is not None:
+        return db.session.execute(_SCHEDULE_GRID_ROWS, {'schedule_id': schedule_id}).all()
+    return db.session.execute(_WEEK_GRID_ROWS, {'start': start, 'end': end}).all()
@@ -1,5 +1,6 @@
 from App.models import HelpDeskAssistant
 from App.database import db
+from sqlalchemy.orm import joinedload
 
 def create_help_desk_assistant(username):
     new_assistant = HelpDeskAssistant(username=username)
@@ -9,8 +10,8 @@ def create_help_desk_assistant(username):
 
 
 def get_help_desk_assistant(username):
-    return HelpDeskAssistant.query.filter_by(username=username).first()
+    return db.session.get(HelpDeskAssistant, username)
 
 
 def get_active_help_desk_assistants():
-    return HelpDeskAssistant.query.filter_by(active=True).all()
+    return HelpDeskAssistant.query.options(joinedload(HelpDeskAssistant.student)).filter_by(active=True).all()
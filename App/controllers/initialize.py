@@ -1,43 +1,64 @@
 from App.controllers.admin import create_admin
-from App.controllers.availability import create_availability
-from App.controllers.course import create_course, create_course_capability, get_all_courses
-from App.controllers.help_desk_assistant import create_help_desk_assistant, get_help_desk_assistant
-from App.controllers.lab_assistant import create_lab_assistant, get_lab_assistant
 from App.controllers.notification import *
-from App.controllers.student import create_student
 from App.database import db
-from datetime import datetime, timedelta, time
-from sqlalchemy import text
-import logging, csv, os
+from App.models import Availability, Course, Student, HelpDeskAssistant, LabAssistant, CourseCapability
+from App.utils.csv_seed import STUDENT_COLUMNS, availability_rows, csv_rows, student_mapping
+from datetime import datetime, timedelta
+from sqlalchemy import CheckConstraint, inspect
+from itertools import islice
+import logging, os
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def initialize():
+# Rows per executemany when loading the sample csv files
+_CSV_BATCH_SIZE = 1000
+
+def initialize(force=False):
     """
     Initialize the database with sample data for the help desk scheduling application.
     This combines functionality from the original initialize.py and initialize_sample_data.py.
+    
+    The schema is only dropped and recreated when it no longer matches the models
+    or force is set; otherwise the existing tables are emptied and reseeded.
     """
     logger.info("Starting database initialization")
     
-    # Drop and recreate all tables
-    db.drop_all()
-    db.create_all()
-    admin = create_admin('a', '123', 'helpdesk')
-    logger.info(f"Created admin user: {admin.username}")
-    admin = create_admin('b', '123', 'lab')
-    logger.info(f"Created admin user: {admin.username}")
-    create_standard_courses()
+    rebuild_schema = force or not _schema_is_current()
+    if rebuild_schema:
+        # Drop and recreate all tables
+        db.drop_all()
+        db.create_all()
     skip_help_desk = os.environ.get('SKIP_HELP_DESK_SAMPLE', '').lower() in ['1', 'true', 'yes']
-    if skip_help_desk:
-        logger.info("Skipping help desk assistant sample data seeding due to SKIP_HELP_DESK_SAMPLE flag")
-    else:
-        create_help_desk_assistants()
-        create_help_desk_assistants_availability()
-        create_help_desk_assistants_course_capabilities()
-        create_lab_assistants()
-        create_lab_assistants_availability()
+    
+    # Seed everything in one transaction so the database is synced to disk once
+    # rather than after every step; a failing step leaves nothing half-seeded.
+    # Autoflush is off because no seed step reads back pending objects, so the
+    # lookups in between need not flush the session first
+    with db.session.no_autoflush:
+        try:
+            _defer_sqlite_foreign_keys()
+            if not rebuild_schema:
+                _clear_all_tables()
+            admin = create_admin('a', '123', 'helpdesk', commit=False)
+            logger.info(f"Created admin user: {admin.username}")
+            admin = create_admin('b', '123', 'lab', commit=False)
+            logger.info(f"Created admin user: {admin.username}")
+            create_standard_courses(commit=False)
+            if skip_help_desk:
+                logger.info("Skipping help desk assistant sample data seeding due to SKIP_HELP_DESK_SAMPLE flag")
+            else:
+                create_help_desk_assistants(commit=False)
+                create_help_desk_assistants_availability(commit=False)
+                create_help_desk_assistants_course_capabilities(commit=False)
+                create_lab_assistants(commit=False)
+                create_lab_assistants_availability(commit=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.error("Database initialization failed, no sample data was saved")
+            raise
     
     if skip_help_desk:
         logger.info('Database initialized successfully (help desk assistant sample data skipped)')
@@ -45,136 +66,201 @@ def initialize():
         logger.info('Database initialized successfully with all sample data')
 
 
-def create_standard_courses():
-    """Create all standard courses in the database"""
+def create_standard_courses(commit=True):
+    """Create all standard courses in the database and return their codes"""
     logger.info("Creating standard courses")
     
-    # First, check if courses already exist
-    existing_courses = get_all_courses()
-    if existing_courses:
-        for course in existing_courses:
-            db.session.delete(course)
-            db.session.commit()
+    # Replace any existing courses with one DELETE instead of loading and deleting each.
+    # Skipping session synchronization is safe as long as callers do not keep using Course
+    # objects loaded before this call: initialize() reaches it with an empty table, and
+    # instances committed earlier are expired, so they reload from the reinserted rows.
+    Course.query.delete(synchronize_session=False)
     
     # Create all courses from the standardized list
     try:
-        with open('sample/courses.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                course = create_course(code=row['code'], name=row['name'])
+        courses = [{'code': code, 'name': name} for code, name in csv_rows('sample/courses.csv', ('code', 'name'))]
+        
+        # A single Core executemany; no ORM objects are needed for the inserted rows
+        if courses:
+            db.session.execute(Course.__table__.insert(), courses)
+        if commit:
+            db.session.commit()
         
-        courses = get_all_courses()
         logger.info(f"Successfully created {len(courses)} standard courses")
+        return [course['code'] for course in courses]
     except Exception as e:
-        db.session.rollback()
         logger.error(f"Error creating standard courses: {e}")
+        if not commit:
+            raise
+        db.session.rollback()
+        return []
 
 
-def create_help_desk_assistants():
+def create_help_desk_assistants(commit=True):
     logger.info("Creating help desk assistants")
     
     # Create help desk assistants from the csv
     try:
-        with open('sample/help_desk_assistants.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Create student record
-                student = create_student(row['username'], row['password'], row['degree'], row['name'])
-                # Create help desk assistant record
-                create_help_desk_assistant(student.username)
-                logger.info(f"Successfully created help desk assistant: {student.name}")
+        created = 0
+        rows = csv_rows('sample/help_desk_assistants.csv', STUDENT_COLUMNS)
+        # One executemany per table and batch instead of an add/commit pair per row
+        for batch in _chunks(rows):
+            db.session.bulk_insert_mappings(Student, [student_mapping(*row) for row in batch])
+            db.session.bulk_insert_mappings(HelpDeskAssistant, [
+                {'username': username, 'rate': 35.00 if degree == 'MSc' else 20.00}
+                for username, _, _, degree in batch
+            ])
+            created += len(batch)
+        if commit:
+            db.session.commit()
+        logger.info(f"Successfully created {created} help desk assistants")
     except Exception as e:
-        db.session.rollback()
         logger.error(f"Error creating help desk assistants: {e}")
+        if not commit:
+            raise
+        db.session.rollback()
 
 
-def create_help_desk_assistants_availability():
+def create_help_desk_assistants_availability(commit=True):
     logger.info("Creating help desk assistants availability data")
-    
-    # Create help desk assistant availability from the csv
-    try:
-        with open('sample/help_desk_assistants_availability.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Parse time strings
-                start_time_parts = row['start_time'].split(':')
-                end_time_parts = row['end_time'].split(':')
-                
-                # Create time objects
-                start_time= time(int(start_time_parts[0]), int(start_time_parts[1]), int(start_time_parts[2]) if len(start_time_parts) > 2 else 0)
-                end_time = time(int(end_time_parts[0]), int(end_time_parts[1]), int(end_time_parts[2]) if len(end_time_parts) > 2 else 0)
-                
-                assistant = get_help_desk_assistant(row['username'])
-                if assistant:
-                    # Create availability record
-                    create_availability(row['username'], row['day_of_week'], start_time, end_time)
-                else:
-                    logger.error(f"Help Desk assistant {row['username']} not found for availability creation")         
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error creating help desk assistant availability: {e}")
+    _create_availability_from_csv('sample/help_desk_assistants_availability.csv', HelpDeskAssistant, 'Help Desk assistant', commit)
 
 
-def create_help_desk_assistants_course_capabilities():
+def create_help_desk_assistants_course_capabilities(commit=True):
     logger.info("Creating help desk assistants course capability data")
     
     # Create help desk assistant course capabilities from the csv
     try:
-        with open('sample/help_desk_assistants_courses.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                assistant = get_help_desk_assistant(row['username'])
-                if assistant:
-                    # Create course capability record
-                    create_course_capability(row['username'], row['code'])
+        assistants = _all_usernames(HelpDeskAssistant)
+        for batch in _chunks(csv_rows('sample/help_desk_assistants_courses.csv', ('username', 'code'))):
+            capabilities = []
+            for username, code in batch:
+                if username in assistants:
+                    capabilities.append({'assistant_username': username, 'course_code': code})
                 else:
-                    logger.error(f"Help Desk assistant {row['username']} not found for course capability creation")
+                    logger.error(f"Help Desk assistant {username} not found for course capability creation")
+            db.session.bulk_insert_mappings(CourseCapability, capabilities)
+        
+        if commit:
+            db.session.commit()
     except Exception as e:
-        db.session.rollback()
         logger.error(f"Error creating help desk assistant course capabilities: {e}")
+        if not commit:
+            raise
+        db.session.rollback()
     
 
-def create_lab_assistants():
+def create_lab_assistants(commit=True):
     logger.info("Creating lab assistants")
     
     # Create lab assistants from the csv
     try:
-        with open('sample/lab_assistants.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Create student record
-                student = create_student(row['username'], row['password'], row['degree'], row['name'])
-                # Create lab assistant record
-                create_lab_assistant(student.username, row['experience'])
-                logger.info(f"Successfully created lab assistant: {student.name}")
+        created = 0
+        rows = csv_rows('sample/lab_assistants.csv', STUDENT_COLUMNS + ('experience',))
+        for batch in _chunks(rows):
+            db.session.bulk_insert_mappings(Student, [student_mapping(*row[:4]) for row in batch])
+            db.session.bulk_insert_mappings(LabAssistant, [
+                {'username': row[0], 'experience': bool(int(row[4])), 'active': True}
+                for row in batch
+            ])
+            created += len(batch)
+        if commit:
+            db.session.commit()
+        logger.info(f"Successfully created {created} lab assistants")
     except Exception as e:
-        db.session.rollback()
         logger.error(f"Error creating lab assistants: {e}")
+        if not commit:
+            raise
+        db.session.rollback()
 
 
-def create_lab_assistants_availability():
+def create_lab_assistants_availability(commit=True):
     logger.info("Creating lab assistants availability data")
-    
-    # Create lab assistant availability from the csv
+    _create_availability_from_csv('sample/lab_assistants_availability.csv', LabAssistant, 'Lab assistant', commit)
+
+
+def _create_availability_from_csv(path, assistant_model, label, commit=True):
+    """Insert the availability rows in path for usernames that have an assistant_model row"""
     try:
-        with open('sample/lab_assistants_availability.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Parse time strings
-                start_time_parts = row['start_time'].split(':')
-                end_time_parts = row['end_time'].split(':')
-                
-                # Create time objects
-                start_time= time(int(start_time_parts[0]), int(start_time_parts[1]), int(start_time_parts[2]) if len(start_time_parts) > 2 else 0)
-                end_time = time(int(end_time_parts[0]), int(end_time_parts[1]), int(end_time_parts[2]) if len(end_time_parts) > 2 else 0)
-                
-                assistant = get_lab_assistant(row['username'])
-                if assistant:
-                    # Create availability record
-                    create_availability(row['username'], row['day_of_week'], start_time, end_time)
+        assistants = _all_usernames(assistant_model)
+        for rows in _chunks(availability_rows(path)):
+            availabilities = []
+            for username, day_of_week, start_time, end_time in rows:
+                if username in assistants:
+                    availabilities.append({
+                        'username': username,
+                        'day_of_week': day_of_week,
+                        'start_time': start_time,
+                        'end_time': end_time,
+                    })
                 else:
-                    logger.error(f"Lab assistant {row['username']} not found for availability creation")             
+                    logger.error(f"{label} {username} not found for availability creation")
+            
+            # One executemany per batch instead of one INSERT and commit per csv row
+            if availabilities:
+                db.session.execute(Availability.__table__.insert(), availabilities)
+        if commit:
+            db.session.commit()
     except Exception as e:
+        logger.error(f"Error creating {label.lower()} availability: {e}")
+        if not commit:
+            raise
         db.session.rollback()
-        logger.error(f"Error creating lab assistant availability: {e}")
+
+
+def _chunks(iterable, size=_CSV_BATCH_SIZE):
+    """Yield lists of up to size items, so a csv is inserted in batches without being read whole"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _defer_sqlite_foreign_keys():
+    """Check SQLite foreign keys once at commit instead of after every seed statement"""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    
+    # The seed still fails as a whole on a dangling key, and SQLite switches this back off
+    # when the transaction ends, so nothing leaks onto the pooled connection afterwards.
+    # Durability is left at the WAL/synchronous=NORMAL settings App.database applies on connect
+    db.session.connection().exec_driver_sql('PRAGMA defer_foreign_keys=ON')
+
+
+def _schema_is_current():
+    """True when every model table exists with exactly the model's columns and all of its indexes and named checks"""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            return False
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        if existing_columns != set(table.columns.keys()):
+            return False
+        # There are no migrations, so an index or check added to a model only reaches an
+        # existing database through the rebuild
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        if not {index.name for index in table.indexes} <= existing_indexes:
+            return False
+        existing_checks = {check['name'] for check in inspector.get_check_constraints(table.name)}
+        model_checks = {
+            constraint.name for constraint in table.constraints
+            if isinstance(constraint, CheckConstraint) and constraint.name
+        }
+        if not model_checks <= existing_checks:
+            return False
+    return True
+
+
+def _clear_all_tables():
+    """Delete every row from the model tables, children before parents"""
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+
+
+def _all_usernames(model):
+    """Every username in model's table, loaded with one query instead of a lookup per csv row"""
+    return {username for (username,) in db.session.query(model.username)}
 
@@ -1,5 +1,6 @@
 from App.models import LabAssistant
 from App.database import db
+from sqlalchemy.orm import joinedload
 
 def create_lab_assistant(username, experience):
     new_assistant = LabAssistant(username=username, experience=bool(int(experience)))
@@ -9,9 +10,9 @@ def create_lab_assistant(username, experience):
 
 
 def get_lab_assistant(username):
-    return LabAssistant.query.filter_by(username=username).first()
+    return db.session.get(LabAssistant, username)
 
 
 def get_active_lab_assistants():
-    return LabAssistant.query.filter_by(active=True).all()
+    return LabAssistant.query.options(joinedload(LabAssistant.student)).filter_by(active=True).all()
 
@@ -3,19 +3,33 @@ from App.database import db
 from datetime import datetime
 from App.utils.time_utils import trinidad_now
 
-def create_notification(username, message, notification_type):
-    """Create a new notification for a user"""
+def build_notification(username, message, notification_type, created_at=None):
+    """Construct a notification without adding it to the session, so callers can batch and commit once"""
     notification = Notification(
         username=username,
         message=message,
         notification_type=notification_type
     )
     # Explicitly set the timestamp to ensure it uses the current (possibly mocked) time
-    notification.created_at = trinidad_now()
+    notification.created_at = created_at or trinidad_now()
+    return notification
+
+def create_notification(username, message, notification_type, commit=True):
+    """Create a new notification for a user"""
+    notification = build_notification(username, message, notification_type)
     db.session.add(notification)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return notification
 
+def create_notifications(usernames, message, notification_type):
+    """Create the same notification for several users with a single insert batch and commit"""
+    created_at = trinidad_now()
+    notifications = [build_notification(username, message, notification_type, created_at) for username in usernames]
+    db.session.add_all(notifications)
+    db.session.commit()
+    return notifications
+
 def get_user_notifications(username, limit=20, include_read=False):
     """Get notifications for a user, with newest first"""
     query = Notification.query.filter_by(username=username)
@@ -31,22 +45,16 @@ def get_notification(notification_id):
 
 def mark_notification_as_read(notification_id):
     """Mark a notification as read"""
-    notification = get_notification(notification_id)
-    if notification:
-        notification.is_read = True
-        db.session.add(notification)
-        db.session.commit()
-        return True
-    return False
+    # A single UPDATE; the matched row count tells us whether the notification exists
+    updated = Notification.query.filter_by(id=notification_id).update({Notification.is_read: True})
+    db.session.commit()
+    return updated > 0
 
 def mark_all_notifications_as_read(username):
     """Mark all notifications for a user as read"""
-    notifications = Notification.query.filter_by(username=username, is_read=False).all()
-    for notification in notifications:
-        notification.is_read = True
-        db.session.add(notification)
+    updated = Notification.query.filter_by(username=username, is_read=False).update({Notification.is_read: True})
     db.session.commit()
-    return len(notifications)
+    return updated
 
 def delete_notification(notification_id):
     """Delete a notification by ID"""
@@ -62,69 +70,70 @@ def count_unread_notifications(username):
     return Notification.query.filter_by(username=username, is_read=False).count()
 
 # Functions to create common notification types
-def notify_shift_approval(username, shift_details):
+def notify_shift_approval(username, shift_details, commit=True):
     """Notify a user that their shift change request was approved"""
     message = f"Your shift change request for {shift_details} was approved."
-    return create_notification(username, message, Notification.TYPE_APPROVAL)
+    return create_notification(username, message, Notification.TYPE_APPROVAL, commit=commit)
 
-def notify_shift_rejection(username, shift_details):
+def notify_shift_rejection(username, shift_details, commit=True):
     """Notify a user that their shift change request was rejected"""
     message = f"Your shift change request for {shift_details} was rejected."
-    return create_notification(username, message, Notification.TYPE_APPROVAL)
+    return create_notification(username, message, Notification.TYPE_APPROVAL, commit=commit)
 
-def notify_clock_in(username, shift_details):
+def notify_clock_in(username, shift_details, commit=True):
     """Notify a user that they clocked in for a shift"""
     message = f"You clocked in for your {shift_details} shift."
-    return create_notification(username, message, Notification.TYPE_CLOCK_IN)
+    return create_notification(username, message, Notification.TYPE_CLOCK_IN, commit=commit)
 
-def notify_clock_out(username, shift_details, auto_completed=False):
+def notify_clock_out(username, shift_details, auto_completed=False, commit=True):
     """Notify a user that they clocked out for a shift"""
     if auto_completed:
         message = f"Your shift for {shift_details} has ended and you've been automatically clocked out."
     else:
         message = f"You clocked out for your {shift_details} shift."
-    return create_notification(username, message, Notification.TYPE_CLOCK_OUT)
+    return create_notification(username, message, Notification.TYPE_CLOCK_OUT, commit=commit)
 
-def notify_schedule_published(username, schedule_date_range=None):
+def notify_schedule_published(username, schedule_date_range=None, commit=True):
     """Notify a user that a new schedule was published"""
+    message = _schedule_published_message(schedule_date_range)
+    return create_notification(username, message, Notification.TYPE_SCHEDULE, commit=commit)
+
+def notify_schedule_published_to_all(usernames, schedule_date_range=None):
+    """Notify every user in usernames that a new schedule was published"""
+    message = _schedule_published_message(schedule_date_range)
+    return create_notifications(usernames, message, Notification.TYPE_SCHEDULE)
+
+def _schedule_published_message(schedule_date_range):
     if schedule_date_range:
-        message = f"A new schedule for {schedule_date_range} has been published. Check out your shifts."
-    else:
-        message = f"A new schedule has been published. Check out your shifts for the upcoming period."
-    return create_notification(username, message, Notification.TYPE_SCHEDULE)
+        return f"A new schedule for {schedule_date_range} has been published. Check out your shifts."
+    return f"A new schedule has been published. Check out your shifts for the upcoming period."
 
-def notify_shift_reminder(username, shift_details, minutes_before=15):
+def notify_shift_reminder(username, shift_details, minutes_before=15, commit=True):
     """Notify a user about an upcoming shift"""
     message = f"Your {shift_details} shift starts in {minutes_before} minutes."
-    return create_notification(username, message, Notification.TYPE_REMINDER)
+    return create_notification(username, message, Notification.TYPE_REMINDER, commit=commit)
 
-def notify_request_submitted(username, shift_details):
+def notify_request_submitted(username, shift_details, commit=True):
     """Notify a user that their shift change request was submitted"""
     message = f"Your request for {shift_details} was submitted and is pending approval."
-    return create_notification(username, message, Notification.TYPE_REQUEST)
+    return create_notification(username, message, Notification.TYPE_REQUEST, commit=commit)
 
-def notify_missed_shift(username, shift_details):
+def notify_missed_shift(username, shift_details, commit=True):
     """Notify a user that they missed a shift"""
     message = f"You missed your {shift_details} shift."
-    return create_notification(username, message, Notification.TYPE_MISSED)
+    return create_notification(username, message, Notification.TYPE_MISSED, commit=commit)
 
-def notify_availability_updated(username):
+def notify_availability_updated(username, commit=True):
     """Notify a user that their availability was updated"""
     message = "Your availability was successfully updated."
-    return create_notification(username, message, Notification.TYPE_UPDATE)
+    return create_notification(username, message, Notification.TYPE_UPDATE, commit=commit)
 
-def notify_admin_new_request(admin_username, student_name, student_id, shift_details):
+def notify_admin_new_request(admin_username, student_name, student_id, shift_details, commit=True):
     """Notify an admin about a new shift change request"""
     message = f"New request from {student_name} ({student_id}) for {shift_details}."
-    return create_notification(admin_username, message, Notification.TYPE_REQUEST)
+    return create_notification(admin_username, message, Notification.TYPE_REQUEST, commit=commit)
 
 def notify_all_admins(message, notification_type):
     """Send a notification to all admin users"""
-    admins = User.query.filter_by(type='admin').all()
-    notifications = []
-    
-    for admin in admins:
-        notification = create_notification(admin.username, message, notification_type)
-        notifications.append(notification)
-    
-    return notifications
\ No newline at end of file
+    admin_usernames = [username for (username,) in db.session.query(User.username).filter_by(type='admin')]
+    return create_notifications(admin_usernames, message, notification_type)
@@ -187,6 +187,12 @@ def _parse_time_component(value: Any) -> Optional[dt_time]:
         hour = int(value)
         return dt_time(hour=hour)
     if isinstance(value, str):
+        # Zero-padded HH:MM / HH:MM:SS is the common case; fromisoformat parses it in C
+        if len(value) in (5, 8):
+            try:
+                return dt_time.fromisoformat(value)
+            except ValueError:
+                pass
         pieces = value.split(':')
         try:
             hour = int(pieces[0])
@@ -241,13 +247,15 @@ def admin_update_staff_profile(username: str, data: Dict[str, Any]) -> Tuple[boo
 
     if 'courses' in data:
         CourseCapability.query.filter_by(assistant_username=username).delete()
-        for course_code in data['courses']:
-            if not course_code:
-                continue
-            course = Course.query.get(course_code)
-            if not course:
-                course = Course(course_code, f"Course {course_code}")
-                db.session.add(course)
+        # Look up which of the requested courses exist with one query instead of one per course
+        course_codes = [course_code for course_code in data['courses'] if course_code]
+        known_codes = {
+            code for (code,) in db.session.query(Course.code).filter(Course.code.in_(course_codes))
+        } if course_codes else set()
+        for course_code in course_codes:
+            if course_code not in known_codes:
+                db.session.add(Course(course_code, f"Course {course_code}"))
+                known_codes.add(course_code)
             capability = CourseCapability(username, course_code)
             db.session.add(capability)
 
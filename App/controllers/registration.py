@@ -10,7 +10,7 @@ import os
 import json
 from datetime import datetime, time
 from urllib.parse import urlparse
-from App.utils.time_utils import trinidad_now, convert_to_trinidad_time
+from App.utils.time_utils import convert_to_trinidad_time
 
 
 def create_registration_request(username, name, email, degree, reason=None, phone=None, transcript_url=None, profile_picture_url=None, courses=None, password=None, availability_slots=None):
@@ -119,12 +119,13 @@ def create_registration_request(username, name, email, degree, reason=None, phon
                     print(f"Error creating availability slot: {e}")
                     # Continue with other slots even if this one fails
         
-        admin_users = User.query.filter_by(type='admin').all()
-        for admin in admin_users:
+        # Queue the admin notifications so they commit together with the registration
+        for (admin_username,) in db.session.query(User.username).filter_by(type='admin'):
             create_notification(
-                admin.username,
+                admin_username,
                 f"New registration request from {name} ({username}).",
-                Notification.TYPE_REQUEST
+                Notification.TYPE_REQUEST,
+                commit=False
             )
         
         db.session.commit()
@@ -258,6 +259,11 @@ def approve_registration(request_id, admin_username):
         for rc in registration_courses:
             db.session.add(CourseCapability(assistant_username=username, course_code=rc.course_code))
 
+        # Availability, queued so the new account and all of its rows commit together
+        reg_availability = RegistrationAvailability.query.filter_by(registration_id=request_id).all()
+        for reg_avail in reg_availability:
+            create_availability(username, reg_avail.day_of_week, reg_avail.start_time, reg_avail.end_time, commit=False)
+
         registration.approve(admin_username)
         notification = Notification(
             username=username,
@@ -268,11 +274,6 @@ def approve_registration(request_id, admin_username):
 
         db.session.commit()
 
-        # Availability after commit
-        reg_availability = RegistrationAvailability.query.filter_by(registration_id=request_id).all()
-        for reg_avail in reg_availability:
-            create_availability(username, reg_avail.day_of_week, reg_avail.start_time, reg_avail.end_time)
-
         return True, "Registration approved successfully"
     except Exception as e:
         db.session.rollback()
@@ -289,10 +290,7 @@ def reject_registration(request_id, admin_username):
         if registration.status != 'PENDING':
             return False, f"Registration has already been {registration.status.lower()}"
         
-        registration.status = 'REJECTED'
-        registration.processed_at = trinidad_now()
-        registration.processed_by = admin_username
-        db.session.add(registration)
+        registration.reject(admin_username)
         db.session.commit()
         
         return True, "Registration rejected successfully"
@@ -10,6 +10,7 @@ from App.controllers.notification import (
     Notification
 )
 from App.utils.time_utils import trinidad_now, convert_to_trinidad_time
+from App.utils.fastfmt import fmt_shift_date
 from App.models import Allocation, Shift
 from datetime import datetime, timedelta
 from App.models import HelpDeskAssistant
@@ -85,16 +86,15 @@ def approve_request(request_id):
     if not request:
         return False, "Request not found"
     
-    request.status = "APPROVED"
-    request.approved_at = trinidad_now()
-    db.session.add(request)
+    # Status and timestamp change together, so the commit below writes them in one UPDATE
+    request.approve()
     
     # Create notification for the student
     shift_details = request.time_slot
     if request.date:
         shift_details = f"{request.date.strftime('%A, %b %d')}, {request.time_slot}"
         
-    notify_shift_approval(request.username, shift_details)
+    notify_shift_approval(request.username, shift_details, commit=False)
     
     db.session.commit()
     return True, "Request approved successfully"
@@ -105,16 +105,15 @@ def reject_request(request_id):
     if not request:
         return False, "Request not found"
     
-    request.status = "REJECTED"
-    request.rejected_at = trinidad_now()
-    db.session.add(request)
+    # Status and timestamp change together, so the commit below writes them in one UPDATE
+    request.reject()
     
     # Create notification for the student
     shift_details = request.time_slot
     if request.date:
         shift_details = f"{request.date.strftime('%A, %b %d')}, {request.time_slot}"
         
-    notify_shift_rejection(request.username, shift_details)
+    notify_shift_rejection(request.username, shift_details, commit=False)
     
     db.session.commit()
     return True, "Request rejected successfully"
@@ -132,7 +131,7 @@ def create_student_request(username, shift_id, reason, replacement=None):
             return False, "Shift not found"
         
         shift_date = shift.date
-        time_slot = f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
+        time_slot = shift.formatted_time()
     else:
         # If no shift_id is provided, the time_slot should be provided directly
         time_slot = "Custom Time"
@@ -155,20 +154,21 @@ def create_student_request(username, shift_id, reason, replacement=None):
     if shift_date:
         shift_details = f"{shift_date.strftime('%A, %b %d')}, {time_slot}"
         
-    notify_request_submitted(username, shift_details)
+    # The request and all of its notifications are committed together below
+    notify_request_submitted(username, shift_details, commit=False)
     
     # Create notification for admin users
     student = Student.query.get(username)
     student_name = student.get_name() if student else username
     
     # Notify all admins
-    admin_users = User.query.filter_by(type='admin').all()
-    for admin in admin_users:
+    for (admin_username,) in db.session.query(User.username).filter_by(type='admin'):
         notify_admin_new_request(
-            admin.username, 
+            admin_username, 
             student_name, 
             username, 
-            shift_details
+            shift_details,
+            commit=False
         )
     
     db.session.commit()
@@ -223,8 +223,8 @@ def get_available_shifts_for_student(username):
             shift_data = {
                 "id": shift.id,
                 "day": day_name,
-                "date": shift.date.strftime("%d %b"),
-                "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
+                "date": fmt_shift_date(shift.date),
+                "time": shift.formatted_time()
             }
             result.append(shift_data)
     
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, date, time
 from flask import jsonify, render_template, url_for
 from ortools.sat.python import cp_model
 import logging, csv, random
-from sqlalchemy import text, and_, func, select
+from sqlalchemy import text, and_, bindparam, func, select
 from typing import Any, Union, Optional
 
 # Try to import SQLAlchemy ORM functions with fallback for older versions
@@ -22,14 +22,14 @@ except ImportError:
 from App.models import (
     Schedule, Shift, Student, HelpDeskAssistant, 
     CourseCapability, Availability, 
-    Allocation, Course
+    Allocation, Course, ShiftCourseDemand, TimeEntry, Request
 )
 from App.database import db
+from App.controllers.allocation import bulk_create_allocations
 from App.controllers.course import create_course, get_all_courses
 from App.controllers import schedule_config as schedule_config_controller
 from App.controllers.lab_assistant import *
-from App.controllers.notification import notify_schedule_published
-from App.controllers.shift import create_shift
+from App.controllers.notification import notify_schedule_published_to_all
 from App.utils.time_utils import trinidad_now, convert_to_trinidad_time
 from weasyprint import HTML, CSS
 import tempfile
@@ -46,6 +46,12 @@ from App.utils.performance_monitor import (
 
 logger = logging.getLogger(__name__)
 
+# Shift start offsets from midnight, built once instead of on every generation loop
+_HELP_DESK_HOUR_OFFSETS = tuple(timedelta(hours=hour) for hour in range(9, 17))  # 9am through 4pm
+_LAB_SHIFT_OFFSETS = tuple(timedelta(hours=hour) for hour in range(8, 17, 4))  # 8am, 12pm, 4pm
+_ONE_HOUR = timedelta(hours=1)
+_FOUR_HOURS = timedelta(hours=4)
+
 # Using centralized performance monitoring from utils
 
 def _to_datetime_start_of_day(d):
@@ -106,7 +112,6 @@ def get_current_published_schedule(today=None):
 def get_shifts_for_student(username, limit=None):
     """Get upcoming shifts for a specific student."""
     try:
-        from datetime import datetime
         now = trinidad_now()
         
         # Get shifts via allocations for this student, future shifts only
@@ -131,8 +136,6 @@ def get_shifts_for_student(username, limit=None):
 def get_shifts_for_student_in_range(username, start_date, end_date):
     """Get shifts for a student within a specific date range."""
     try:
-        from datetime import datetime
-        
         # Parse date strings if needed
         if isinstance(start_date, str):
             start_date = datetime.fromisoformat(start_date).date()
@@ -277,12 +280,14 @@ def generate_help_desk_schedule(start_date=None, end_date=None, **generation_opt
             with open('sample/courses.csv', newline='') as csvfile:
                 reader = csv.DictReader(csvfile)
                 for row in reader:
-                    create_course(row['code'], row['name'])
+                    create_course(row['code'], row['name'], commit=False)
+            db.session.flush()
             all_courses = get_all_courses()
             logger.info(f"Created {len(all_courses)} standard courses")
         
         # Generate shifts for the schedule (only for the specified date range)
         shifts = []
+        shift_demands = []  # (shift, tutors_required, weight) applied to every course
         current_date = start_date
 
         active_config = schedule_config_controller.get_active_config()
@@ -303,25 +308,8 @@ def generate_help_desk_schedule(start_date=None, end_date=None, **generation_opt
                     break
 
                 shift = Shift(day_dt, shift_start, shift_end, schedule.id)
-                db.session.add(shift)
-                db.session.flush()
                 shifts.append(shift)
-
-                for course in all_courses:
-                    try:
-                        add_course_demand_to_shift(
-                            shift.id,
-                            course.code,
-                            active_config.staff_per_shift,
-                            active_config.staff_per_shift
-                        )
-                    except Exception as e:
-                        logger.error(
-                            "Error adding course demand for %s to shift %s: %s",
-                            course.code,
-                            shift.id,
-                            str(e)
-                        )
+                shift_demands.append((shift, active_config.staff_per_shift, active_config.staff_per_shift))
 
                 shift_start = shift_end
 
@@ -332,28 +320,28 @@ def generate_help_desk_schedule(start_date=None, end_date=None, **generation_opt
             else:
                 # Skip weekends (day_of_week >= 5)
                 if current_date.weekday() < 5:  # 0=Monday through 4=Friday
-                    # Generate hourly shifts for this day (9am-5pm)
-                    for hour in range(9, 17):  # 9am through 4pm
-                        base_date = current_date.date() if isinstance(current_date, datetime) else current_date
-                        shift_start = datetime.combine(base_date, time(0, 0)) + timedelta(hours=hour)
-                        shift_end = shift_start + timedelta(hours=1)
+                    # Generate hourly shifts for this day (9am-5pm); current_date is already at midnight
+                    for offset in _HELP_DESK_HOUR_OFFSETS:
+                        shift_start = current_date + offset
+                        shift_end = shift_start + _ONE_HOUR
                         
                         shift = Shift(current_date, shift_start, shift_end, schedule.id)
-                        db.session.add(shift)
-                        db.session.flush()  # Get the shift ID
                         shifts.append(shift)
-                        
                         # Default requirement is 2 tutors per course
-                        for course in all_courses:
-                            try:
-                                add_course_demand_to_shift(shift.id, course.code, 2, 2)
-                            except Exception as e:
-                                logger.error(f"Error adding course demand for {course.code} to shift {shift.id}: {str(e)}")
-                                # Continue with other courses
+                        shift_demands.append((shift, 2, 2))
 
             # Move to the next day
             current_date += timedelta(days=1)
         
+        # Insert every shift in one flush, then all of their course demands in one executemany
+        db.session.add_all(shifts)
+        db.session.flush()
+        add_course_demands([
+            {'shift_id': shift.id, 'course_code': course.code, 'tutors_required': tutors_required, 'weight': weight}
+            for shift, tutors_required, weight in shift_demands
+            for course in all_courses
+        ])
+        
         assistants_query = db.session.query(HelpDeskAssistant).filter_by(active=True)
 
         if EAGER_LOADING_AVAILABLE and selectinload:
@@ -435,28 +423,33 @@ def generate_help_desk_schedule(start_date=None, end_date=None, **generation_opt
         d = {}
         w = {}
         
+        # Load the course demands of every shift with one query instead of one per shift
+        demands_by_shift = get_course_demands_for_shifts([shift.id for shift in shifts])
+        
         for j in range(J):
             shift = shift_by_index[j]
-            # Get course demands for this shift
-            demands = get_course_demands_for_shift(shift.id)
+            demands = demands_by_shift.get(shift.id, [])
             
             # Log shift and its demands
-            logger.debug(f"Shift {j} (ID: {shift.id}) has {len(demands)} course demands")
+            logger.debug("Shift %s (ID: %s) has %s course demands", j, shift.id, len(demands))
+            
+            # Index the demands by course code; the first demand for a course wins
+            demand_by_course = {}
+            for demand in demands:
+                demand_by_course.setdefault(demand['course_code'], demand)
             
             # Build d_j,k and w_j,k dictionaries
             for k in range(K):
                 course = course_by_index[k]
+                demand = demand_by_course.get(course.code)
                 
-                # Default: 2 tutors required, weight = tutors_required
-                d[j, k] = 2
-                w[j, k] = 2
-                
-                # Find course-specific demands if they exist
-                for demand in demands:
-                    if demand['course_code'] == course.code:
-                        d[j, k] = demand['tutors_required']
-                        w[j, k] = demand['weight']
-                        break
+                if demand:
+                    d[j, k] = demand['tutors_required']
+                    w[j, k] = demand['weight']
+                else:
+                    # Default: 2 tutors required, weight = tutors_required
+                    d[j, k] = 2
+                    w[j, k] = 2
         
         # --- Variables ---
         # x_i,j = 1 if staff i is assigned to shift j, 0 otherwise
@@ -584,15 +577,18 @@ def generate_help_desk_schedule(start_date=None, end_date=None, **generation_opt
                         assistant = staff_by_index[i]
                         shift = shift_by_index[j]
                         
-                        allocation = Allocation(assistant.username, shift.id, schedule.id)
-                        new_allocations.append(allocation)
+                        new_allocations.append({
+                            'username': assistant.username,
+                            'shift_id': shift.id,
+                            'schedule_id': schedule.id,
+                        })
                         assignment_count += 1
                         
-                        logger.debug(f"Assigned {assistant.username} to shift {shift.id}")
+                        logger.debug("Assigned %s to shift %s", assistant.username, shift.id)
             
             # Batch insert all allocations at once
             if new_allocations:
-                db.session.add_all(new_allocations)
+                bulk_create_allocations(new_allocations, commit=False)
                 logger.info(f"Created {len(new_allocations)} allocations in batch")
             # Transaction will be committed by decorator
             logger.info(f"Schedule generated successfully with status: {status}, {assignment_count} assignments")
@@ -634,62 +630,71 @@ def get_schedule(id, start_date, end_date, type='helpdesk'):
     
     if not schedule:
         # Create a new schedule
-        schedule = create_schedule(schedule_id, start_date, end_date, type)
+        # Flush rather than commit so the whole generation run stays one transaction
+        schedule = create_schedule(schedule_id, start_date, end_date, type, commit=False)
+        db.session.flush()
     else:
         # Update the existing schedule's date range
         schedule.start_date = start_date
         schedule.end_date = end_date
-        db.session.add(schedule)
         db.session.flush()
     return schedule
 
 
-def create_schedule(id, start_date, end_date, type):
+def create_schedule(id, start_date, end_date, type, commit=True):
     new_schedule = Schedule(id=id, start_date=start_date, end_date=end_date, type=type)
     db.session.add(new_schedule)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_schedule
 
 
 def clear_shifts_in_range(schedule_id, start_date, end_date):
-    """Clear existing shifts in the date range"""
-    # Find shifts in this date range
-    shifts_to_delete = Shift.query.filter(
-        Shift.schedule_id == schedule_id,
-        Shift.date >= start_date,
-        Shift.date <= end_date
+    """Clear existing shifts in the date range with one statement per table"""
+    # Find the ids of the shifts in this date range
+    shift_ids = db.session.scalars(
+        select(Shift.id).where(
+            Shift.schedule_id == schedule_id,
+            Shift.date >= start_date,
+            Shift.date <= end_date
+        )
     ).all()
     
-    # Delete allocations for these shifts
-    for shift in shifts_to_delete:
-        Allocation.query.filter_by(shift_id=shift.id).delete()
-        db.session.execute(
-            text("DELETE FROM shift_course_demand WHERE shift_id = :shift_id"),
-            {'shift_id': shift.id}
-        )
+    if not shift_ids:
+        return
+    
+    # Detach time entries and requests, as deleting the shifts through the ORM did
+    TimeEntry.query.filter(TimeEntry.shift_id.in_(shift_ids)).update({'shift_id': None})
+    Request.query.filter(Request.shift_id.in_(shift_ids)).update({'shift_id': None})
     
-    # Now delete the shifts themselves
-    for shift in shifts_to_delete:
-        db.session.delete(shift)
+    # Delete dependent rows before the shifts to respect foreign keys
+    Allocation.query.filter(Allocation.shift_id.in_(shift_ids)).delete()
+    ShiftCourseDemand.query.filter(ShiftCourseDemand.shift_id.in_(shift_ids)).delete()
+    Shift.query.filter(Shift.id.in_(shift_ids)).delete()
     
     db.session.flush()
 
 
 def clear_allocations_for_shifts(shifts):
-    """Clear allocations for the given shifts"""
-    for shift in shifts:
-        Allocation.query.filter_by(shift_id=shift.id).delete()
+    """Clear allocations for the given shifts with a single DELETE"""
+    shift_ids = [shift.id for shift in shifts]
+    if shift_ids:
+        Allocation.query.filter(Allocation.shift_id.in_(shift_ids)).delete()
     
     db.session.flush()
 
 
+# Core insert compiled per dialect; also used for executemany batches
+_INSERT_COURSE_DEMAND = ShiftCourseDemand.__table__.insert()
+
+
 def add_course_demand_to_shift(shift_id, course_code, tutors_required=2, weight=None):
-    """Add course demand for a shift using raw SQL with text()"""
+    """Add course demand for a shift with a Core insert"""
     # If weight is not provided, use tutors_required as the weight
     if weight is None:
         weight = tutors_required
     db.session.execute(
-        text("INSERT INTO shift_course_demand (shift_id, course_code, tutors_required, weight) VALUES (:shift_id, :course_code, :tutors_required, :weight)"),
+        _INSERT_COURSE_DEMAND,
         {
             'shift_id': shift_id, 
             'course_code': course_code, 
@@ -700,13 +705,26 @@ def add_course_demand_to_shift(shift_id, course_code, tutors_required=2, weight=
     db.session.flush()
 
 
+def add_course_demands(demands):
+    """Add many shift course demands with a single executemany
+    
+    Args:
+        demands: List of dicts with shift_id, course_code, tutors_required and weight keys
+    """
+    if demands:
+        db.session.execute(_INSERT_COURSE_DEMAND, demands)
+        db.session.flush()
+
+
+_SELECT_COURSE_DEMANDS_FOR_SHIFT = text(
+    "SELECT course_code, tutors_required, weight FROM shift_course_demand WHERE shift_id = :shift_id"
+)
+
+
 def get_course_demands_for_shift(shift_id):
 
     try:
-        result = db.session.execute(
-            text("SELECT course_code, tutors_required, weight FROM shift_course_demand WHERE shift_id = :shift_id"),
-            {'shift_id': shift_id}
-        )
+        result = db.session.execute(_SELECT_COURSE_DEMANDS_FOR_SHIFT, {'shift_id': shift_id})
         
         # Convert the result to a list of dictionaries
         demands = []
@@ -723,6 +741,35 @@ def get_course_demands_for_shift(shift_id):
         return []  # Return empty list on error
 
 
+_SELECT_COURSE_DEMANDS_FOR_SHIFTS = text(
+    "SELECT shift_id, course_code, tutors_required, weight FROM shift_course_demand WHERE shift_id IN :shift_ids"
+).bindparams(bindparam('shift_ids', expanding=True))
+
+_DELETE_COURSE_DEMANDS_FOR_SCHEDULE = text(
+    "DELETE FROM shift_course_demand WHERE shift_id IN (SELECT id FROM shift WHERE schedule_id = :schedule_id)"
+)
+
+
+def get_course_demands_for_shifts(shift_ids):
+    """Get the course demands of many shifts at once, keyed by shift id"""
+    demands_by_shift = {}
+    if not shift_ids:
+        return demands_by_shift
+    
+    try:
+        result = db.session.execute(_SELECT_COURSE_DEMANDS_FOR_SHIFTS, {'shift_ids': list(shift_ids)})
+        for shift_id, course_code, tutors_required, weight in result:
+            demands_by_shift.setdefault(shift_id, []).append({
+                'course_code': course_code,
+                'tutors_required': tutors_required,
+                'weight': weight
+            })
+    except Exception as e:
+        logger.error(f"Error getting course demands for {len(shift_ids)} shifts: {e}")
+    
+    return demands_by_shift
+
+
 def sync_schedule_data():
 
     try:
@@ -805,12 +852,11 @@ def publish_schedule(schedule_id):
             
         if schedule.publish():
             # Get all unique students assigned to this schedule
-            allocations = Allocation.query.filter_by(schedule_id=schedule_id).all()
-            students = set(allocation.username for allocation in allocations)
+            students = [username for (username,) in
+                        db.session.query(Allocation.username).filter_by(schedule_id=schedule_id).distinct()]
             
-            # Notify each student
-            for username in students:
-                notify_schedule_published(username)
+            # Notify them all with one insert batch and commit
+            notify_schedule_published_to_all(students)
                 
             return {"status": "success", "message": "Schedule published and notifications sent"}
         else:
@@ -853,30 +899,19 @@ def clear_schedule_by_id(schedule_id):
         # 1. First delete all allocations for this schedule
         allocation_count = Allocation.query.filter_by(schedule_id=schedule_id).delete()
         
-        # 2. Get all shift IDs for this schedule
-        shifts = Shift.query.filter_by(schedule_id=schedule_id).all()
-        shift_ids = [shift.id for shift in shifts]
-        shift_count = len(shifts)
-        
-        # 3. Delete all shift course demands using raw SQL
-        if shift_ids:
-            # Convert list to comma-separated string for SQL IN clause
-            shift_ids_str = ','.join(str(id) for id in shift_ids)
-            db.session.execute(
-                text(f"DELETE FROM shift_course_demand WHERE shift_id IN ({shift_ids_str})")
-            )
+        # 2. Delete the course demands of this schedule's shifts without loading the shifts
+        db.session.execute(_DELETE_COURSE_DEMANDS_FOR_SCHEDULE, {'schedule_id': schedule_id})
         
-        # 4. Delete all shifts for this schedule
-        Shift.query.filter_by(schedule_id=schedule_id).delete()
+        # 3. Delete all shifts for this schedule; the deleted row count is the number of shifts removed
+        shift_count = Shift.query.filter_by(schedule_id=schedule_id).delete()
         
-        # 5. Reset schedule published status but keep the schedule record
+        # 4. Reset schedule published status but keep the schedule record
         schedule.is_published = False
-        db.session.add(schedule)
         
         # Commit all changes
         db.session.commit()
         
-        # 6. Force database synchronization
+        # 5. Force database synchronization
         db.session.expire_all()
         
         logger.info(f"Schedule {schedule_id} cleared successfully: {shift_count} shifts and {allocation_count} allocations removed")
@@ -916,30 +951,19 @@ def clear_schedule():
         # 1. First delete all allocations for this schedule
         allocation_count = Allocation.query.filter_by(schedule_id=schedule.id).delete()
         
-        # 2. Get all shift IDs for this schedule
-        shifts = Shift.query.filter_by(schedule_id=schedule.id).all()
-        shift_ids = [shift.id for shift in shifts]
-        shift_count = len(shifts)
-        
-        # 3. Delete all shift course demands using raw SQL
-        if shift_ids:
-            # Convert list to comma-separated string for SQL IN clause
-            shift_ids_str = ','.join(str(id) for id in shift_ids)
-            db.session.execute(
-                text(f"DELETE FROM shift_course_demand WHERE shift_id IN ({shift_ids_str})")
-            )
+        # 2. Delete the course demands of this schedule's shifts without loading the shifts
+        db.session.execute(_DELETE_COURSE_DEMANDS_FOR_SCHEDULE, {'schedule_id': schedule.id})
         
-        # 4. Delete all shifts for this schedule
-        Shift.query.filter_by(schedule_id=schedule.id).delete()
+        # 3. Delete all shifts for this schedule; the deleted row count is the number of shifts removed
+        shift_count = Shift.query.filter_by(schedule_id=schedule.id).delete()
         
-        # 5. Reset schedule published status but keep the schedule record
+        # 4. Reset schedule published status but keep the schedule record
         schedule.is_published = False
-        db.session.add(schedule)
         
         # Commit all changes
         db.session.commit()
         
-        # 6. Force database synchronization
+        # 5. Force database synchronization
         db.session.expire_all()
         
         logger.info(f"Schedule cleared successfully: {shift_count} shifts and {allocation_count} allocations removed")
@@ -1244,18 +1268,20 @@ def generate_lab_schedule(start_date=None, end_date=None, **generation_options):
         while current_date <= end_date:
             # Skip Sunday (day_of_week >= 6)
             if current_date.weekday() < 6:  # 0=Monday through 5=Saturday
-                # Generate three shifts for this day (8am-12pm, 12pm-4pm, 4pm-8pm)
-                for hour in range(8, 17, 4):  # 8am, 12pm, 4pm
-                    base_date = current_date.date() if isinstance(current_date, datetime) else current_date
-                    shift_start = datetime.combine(base_date, datetime.min.time()) + timedelta(hours=hour)
-                    shift_end = shift_start + timedelta(hours=4)
+                # Generate three shifts for this day (8am-12pm, 12pm-4pm, 4pm-8pm); current_date is already at midnight
+                for offset in _LAB_SHIFT_OFFSETS:
+                    shift_start = current_date + offset
+                    shift_end = shift_start + _FOUR_HOURS
                     
-                    shift = create_shift(current_date, shift_start, shift_end, schedule.id)
-                    shifts.append(shift)
+                    shifts.append(Shift(current_date, shift_start, shift_end, schedule.id))
             
             # Move to the next day
             current_date += timedelta(days=1)
         
+        # Insert every shift in one flush rather than a commit per shift
+        db.session.add_all(shifts)
+        db.session.flush()
+        
         shift_by_index = {j: shift for j, shift in enumerate(shifts)}
         J = len(shifts)  # Number of shifts
         
@@ -1381,16 +1407,22 @@ def generate_lab_schedule(start_date=None, end_date=None, **generation_options):
             clear_allocations_for_shifts(shifts)
             
             # Create allocations for the assignments
+            new_allocations = []
             for i in range(I):
                 for j in range(J):
                     if solver.Value(x[i, j]) == 1:
                         assistant = staff_by_index[i]
                         shift = shift_by_index[j]
                         
-                        allocation = Allocation(assistant.username, shift.id, schedule.id)
-                        db.session.add(allocation)
+                        new_allocations.append({
+                            'username': assistant.username,
+                            'shift_id': shift.id,
+                            'schedule_id': schedule.id,
+                        })
                         
-                        logger.debug(f"Assigned {assistant.username} to shift {shift.id}")
+                        logger.debug("Assigned %s to shift %s", assistant.username, shift.id)
+            
+            bulk_create_allocations(new_allocations, commit=False)
             
             # Commit the schedule and all related objects
             db.session.commit()
@@ -1649,7 +1681,6 @@ def generate_schedule_pdf(schedule_data, export_format='standard'):
         ordered_time_slots = [label for _, label in time_slot_entries]
         
         # Add current timestamp
-        from datetime import datetime
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # Render HTML with schedule data
@@ -1694,10 +1725,6 @@ def get_schedule_summary_stats(schedule_type):
         Dictionary with summary statistics
     """
     try:
-        from App.models.schedule import Schedule
-        from App.models.shift import Shift
-        from App.models.allocation import Allocation
-        
         # Get schedule for the type
         schedule_id = 1 if schedule_type == 'helpdesk' else 2
         schedule = Schedule.query.filter_by(id=schedule_id, type=schedule_type).first()
@@ -1897,10 +1924,21 @@ def save_schedule_assignments(schedule_type: str, start_date_str: str, end_date_
             Shift.date >= start_date,
             Shift.date <= end_date
         ).all()
+        clear_allocations_for_shifts(existing_shifts)
+
+        # start_date is parsed at midnight, so each day's anchor is both the shift date and its midnight
+        day_starts = tuple(start_date + timedelta(days=offset) for offset in range(7))
 
-        for shift in existing_shifts:
-            Allocation.query.filter_by(shift_id=shift.id).delete()
+        # Load the week's shifts once instead of looking each one up per assignment
+        shifts_by_start = {}
+        for shift in Shift.query.filter(
+            Shift.schedule_id == schedule.id,
+            Shift.date >= day_starts[0],
+            Shift.date <= day_starts[-1]
+        ).order_by(Shift.id):
+            shifts_by_start.setdefault((shift.date, shift.start_time), shift)
 
+        staffed_shifts = []
         for entry in assignments:
             day_label = entry.get('day')
             time_slot = entry.get('time')
@@ -1911,41 +1949,50 @@ def save_schedule_assignments(schedule_type: str, start_date_str: str, end_date_
                 logger.warning(f"Skipping assignment with invalid day label: {day_label}")
                 continue
 
-            shift_date = start_date + timedelta(days=day_index)
+            shift_date = day_starts[day_index]
             start_hour = _parse_time_to_hour(time_slot, schedule_type)
             if start_hour is None:
                 logger.warning(f"Skipping assignment with invalid time slot: {time_slot}")
                 continue
 
-            shift_start = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=start_hour)
+            shift_start = shift_date + timedelta(hours=start_hour)
             shift_end_hour = _calculate_shift_end(schedule_type, start_hour)
-            shift_end = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=shift_end_hour)
-
-            shift = Shift.query.filter_by(
-                schedule_id=schedule.id,
-                date=shift_date,
-                start_time=shift_start
-            ).first()
+            shift_end = shift_date + timedelta(hours=shift_end_hour)
 
+            shift = shifts_by_start.get((shift_date, shift_start))
             if not shift:
                 shift = Shift(shift_date, shift_start, shift_end, schedule.id)
                 db.session.add(shift)
-                db.session.flush()
+                shifts_by_start[(shift_date, shift_start)] = shift
             else:
                 shift.end_time = shift_end
+            staffed_shifts.append((shift, staff_members))
 
+        # Insert all new shifts in one flush so their ids exist before allocating
+        db.session.flush()
+
+        # Look up the students and existing allocations once, then insert the new rows in one executemany
+        staff_ids = {str(staff['id']) for _, staff_members in staffed_shifts for staff in staff_members if staff.get('id')}
+        known_students = {username for (username,) in db.session.query(Student.username).filter(Student.username.in_(staff_ids))}
+        allocated = set(db.session.query(Allocation.shift_id, Allocation.username).filter(
+            Allocation.shift_id.in_({shift.id for shift, _ in staffed_shifts})
+        ))
+
+        new_allocations = []
+        for shift, staff_members in staffed_shifts:
             for staff in staff_members:
                 staff_id = staff.get('id')
                 if not staff_id:
                     continue
-                student = Student.query.filter_by(username=staff_id).first()
-                if not student:
+                username = str(staff_id)
+                if username not in known_students:
                     logger.warning(f"Skipping allocation for missing student id {staff_id}")
                     continue
-                existing_allocation = Allocation.query.filter_by(shift_id=shift.id, username=student.username).first()
-                if existing_allocation:
+                if (shift.id, username) in allocated:
                     continue
-                db.session.add(Allocation(student.username, shift.id, schedule.id))
+                allocated.add((shift.id, username))
+                new_allocations.append({'username': username, 'shift_id': shift.id, 'schedule_id': schedule.id})
+        bulk_create_allocations(new_allocations, commit=False)
         db.session.commit()
         return {'status': 'success', 'message': 'Schedule assignments saved successfully.'}, 200
     except Exception as exc:
@@ -1978,7 +2025,7 @@ def remove_staff_allocation(schedule_type: str, staff_id: Union[str, int], day_l
                 return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
             shift_date = schedule.start_date + timedelta(days=day_index)
-            shift_start = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=start_hour)
+            shift_start = datetime.combine(shift_date.date(), time.min) + timedelta(hours=start_hour)
 
             target_shift = Shift.query.filter_by(
                 schedule_id=schedule.id,
@@ -2007,15 +2054,13 @@ def _normalize_time_object(time_value, context_description="time value"):
     Convert various time representations to datetime.time object.
     Handles time, datetime, and integer hour values.
     """
-    from datetime import time as dt_time, datetime
-    
-    if isinstance(time_value, dt_time):
+    if isinstance(time_value, time):
         return time_value
     elif isinstance(time_value, datetime):
         return time_value.time()
     elif isinstance(time_value, int):
         if 0 <= time_value <= 23:
-            return dt_time(time_value, 0)
+            return time(time_value, 0)
         else:
             raise ValueError(f"Invalid hour value: {time_value}")
     else:
@@ -2051,8 +2096,7 @@ def list_available_staff_for_slot(schedule_type: str, day_label: str, time_slot:
             return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
         # Convert hour to time object for proper comparison
-        from datetime import time as dt_time
-        requested_time = dt_time(hour, 0)
+        requested_time = time(hour, 0)
         
         available_staff = []
 
@@ -2094,8 +2138,7 @@ def check_staff_availability_for_slot(schedule_type: str, staff_id: Union[str, i
             return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
         # Convert hour to time object for proper comparison
-        from datetime import time as dt_time
-        requested_time = dt_time(hour, 0)
+        requested_time = time(hour, 0)
         
         availability_slots = Availability.query.filter_by(username=staff.username, day_of_week=day_index).all()
         matching_slot = _check_time_slot_availability(availability_slots, requested_time)
@@ -2259,7 +2302,6 @@ def batch_list_available_staff_for_slots(schedule_type: str, slot_queries: list[
 
         # Prepare results by checking each normalized entry against assistants availabilities
         results = []
-        from datetime import time as dt_time
 
         for entry in normalized:
             hour = entry.get('hour')
@@ -2268,7 +2310,7 @@ def batch_list_available_staff_for_slots(schedule_type: str, slot_queries: list[
                 results.append({'shift_id': entry.get('shift_id'), 'date': entry.get('date'), 'hour': hour, 'available_staff': []})
                 continue
 
-            requested_time = dt_time(int(hour), 0)
+            requested_time = time(int(hour), 0)
             available_staff = []
 
             for assistant in assistants:
@@ -9,17 +9,19 @@ from datetime import datetime, timedelta, date, time
 from functools import lru_cache
 from flask import jsonify, render_template
 import logging
+from sqlalchemy import text, select
 from typing import Dict, Any, Optional, List, Tuple, Union
 
 from App.models import (
     Schedule, Shift, Student, HelpDeskAssistant, 
     CourseCapability, Availability, 
-    Allocation, Course
+    Allocation, Course, ShiftCourseDemand, TimeEntry, Request
 )
 from App.database import db
 from App.controllers.course import get_all_courses
 from App.controllers.lab_assistant import get_active_lab_assistants
-from App.controllers.notification import notify_schedule_published
+from App.controllers.allocation import bulk_create_allocations
+from App.controllers.notification import notify_schedule_published_to_all
 from App.controllers.shift import create_shift
 from App.utils.time_utils import trinidad_now
 from App.utils.performance_monitor import (
@@ -233,68 +235,67 @@ def get_schedule(start_date, end_date, type='helpdesk'):
     schedule = Schedule.query.filter_by(id=schedule_id, type=type).first()
     
     if not schedule:
-        schedule = create_schedule(schedule_id, start_date, end_date, type)
+        # Flush rather than commit so the whole generation run stays one transaction
+        schedule = create_schedule(schedule_id, start_date, end_date, type, commit=False)
+        db.session.flush()
     else:
         schedule.start_date = start_date
         schedule.end_date = end_date
-        db.session.add(schedule)
         db.session.flush()
     return schedule
 
 
-def create_schedule(id, start_date, end_date, type):
+def create_schedule(id, start_date, end_date, type, commit=True):
     """Create a new schedule."""
     new_schedule = Schedule(id=id, start_date=start_date, end_date=end_date, type=type)
     db.session.add(new_schedule)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return new_schedule
 
 
 def clear_shifts_in_range(schedule_id, start_date, end_date):
-    """Clear existing shifts in the date range"""
-    from sqlalchemy import text
-    
-    # Find shifts in this date range
-    shifts_to_delete = Shift.query.filter(
-        Shift.schedule_id == schedule_id,
-        Shift.date >= start_date,
-        Shift.date <= end_date
+    """Clear existing shifts in the date range with one statement per table"""
+    # Find the ids of the shifts in this date range
+    shift_ids = db.session.scalars(
+        select(Shift.id).where(
+            Shift.schedule_id == schedule_id,
+            Shift.date >= start_date,
+            Shift.date <= end_date
+        )
     ).all()
     
-    # Delete allocations for these shifts
-    for shift in shifts_to_delete:
-        Allocation.query.filter_by(shift_id=shift.id).delete()
-        
-        # Delete course demands for these shifts using text() for SQL
-        db.session.execute(
-            text("DELETE FROM shift_course_demand WHERE shift_id = :shift_id"),
-            {'shift_id': shift.id}
-        )
+    if not shift_ids:
+        return
     
-    # Now delete the shifts themselves
-    for shift in shifts_to_delete:
-        db.session.delete(shift)
+    # Detach time entries and requests, as deleting the shifts through the ORM did
+    TimeEntry.query.filter(TimeEntry.shift_id.in_(shift_ids)).update({'shift_id': None})
+    Request.query.filter(Request.shift_id.in_(shift_ids)).update({'shift_id': None})
+    
+    # Delete dependent rows before the shifts to respect foreign keys
+    Allocation.query.filter(Allocation.shift_id.in_(shift_ids)).delete()
+    ShiftCourseDemand.query.filter(ShiftCourseDemand.shift_id.in_(shift_ids)).delete()
+    Shift.query.filter(Shift.id.in_(shift_ids)).delete()
     
     db.session.flush()
 
 
 def clear_allocations_for_shifts(shifts):
-    """Clear allocations for the given shifts"""
-    for shift in shifts:
-        Allocation.query.filter_by(shift_id=shift.id).delete()
+    """Clear allocations for the given shifts with a single DELETE"""
+    shift_ids = [shift.id for shift in shifts]
+    if shift_ids:
+        Allocation.query.filter(Allocation.shift_id.in_(shift_ids)).delete()
     
     db.session.flush()
 
 
 def add_course_demand_to_shift(shift_id, course_code, tutors_required=2, weight=None):
-    """Add course demand for a shift using raw SQL with text()"""
-    from sqlalchemy import text
-    
+    """Add course demand for a shift with a Core insert"""
     if weight is None:
         weight = tutors_required
     
     db.session.execute(
-        text("INSERT INTO shift_course_demand (shift_id, course_code, tutors_required, weight) VALUES (:shift_id, :course_code, :tutors_required, :weight)"),
+        ShiftCourseDemand.__table__.insert(),
         {
             'shift_id': shift_id, 
             'course_code': course_code, 
@@ -305,15 +306,15 @@ def add_course_demand_to_shift(shift_id, course_code, tutors_required=2, weight=
     db.session.flush()
 
 
+_SELECT_COURSE_DEMANDS_FOR_SHIFT = text(
+    "SELECT course_code, tutors_required, weight FROM shift_course_demand WHERE shift_id = :shift_id"
+)
+
+
 def get_course_demands_for_shift(shift_id):
     """Get course demands for a specific shift."""
-    from sqlalchemy import text
-    
     try:
-        result = db.session.execute(
-            text("SELECT course_code, tutors_required, weight FROM shift_course_demand WHERE shift_id = :shift_id"),
-            {'shift_id': shift_id}
-        )
+        result = db.session.execute(_SELECT_COURSE_DEMANDS_FOR_SHIFT, {'shift_id': shift_id})
         
         demands = []
         for row in result:
@@ -404,11 +405,10 @@ def publish_schedule(schedule_id):
             return {"status": "error", "message": _ERROR_SCHEDULE_NOT_FOUND}
             
         if schedule.publish():
-            allocations = Allocation.query.filter_by(schedule_id=schedule_id).all()
-            students = {allocation.username for allocation in allocations}
+            students = [username for (username,) in
+                        db.session.query(Allocation.username).filter_by(schedule_id=schedule_id).distinct()]
             
-            for username in students:
-                notify_schedule_published(username)
+            notify_schedule_published_to_all(students)
                 
             return {"status": "success", "message": "Schedule published and notifications sent"}
         else:
@@ -435,9 +435,13 @@ def get_assistants_for_shift(shift_id):
     return assistants
 
 
+_DELETE_COURSE_DEMANDS_FOR_SCHEDULE = text(
+    "DELETE FROM shift_course_demand WHERE shift_id IN (SELECT id FROM shift WHERE schedule_id = :schedule_id)"
+)
+
+
 def clear_schedule_by_id(schedule_id):
     """Clear a specific schedule by ID."""
-    from sqlalchemy import text
     
     try:
         schedule = Schedule.query.get(schedule_id)
@@ -451,23 +455,14 @@ def clear_schedule_by_id(schedule_id):
         # Delete allocations first
         allocation_count = Allocation.query.filter_by(schedule_id=schedule_id).delete()
         
-        # Get shift IDs and delete course demands
-        shifts = Shift.query.filter_by(schedule_id=schedule_id).all()
-        shift_ids = [shift.id for shift in shifts]
-        shift_count = len(shifts)
-        
-        if shift_ids:
-            shift_ids_str = ','.join(str(id) for id in shift_ids)
-            db.session.execute(
-                text(f"DELETE FROM shift_course_demand WHERE shift_id IN ({shift_ids_str})")
-            )
+        # Delete course demands for the schedule's shifts without loading them
+        db.session.execute(_DELETE_COURSE_DEMANDS_FOR_SCHEDULE, {'schedule_id': schedule_id})
         
-        # Delete shifts
-        Shift.query.filter_by(schedule_id=schedule_id).delete()
+        # Delete shifts; the deleted row count is the number of shifts removed
+        shift_count = Shift.query.filter_by(schedule_id=schedule_id).delete()
         
         # Reset published status
         schedule.is_published = False
-        db.session.add(schedule)
         
         db.session.commit()
         db.session.expire_all()
@@ -1111,10 +1106,21 @@ def save_schedule_assignments(schedule_type: str, start_date_str: str, end_date_
             Shift.date >= start_date,
             Shift.date <= end_date
         ).all()
+        clear_allocations_for_shifts(existing_shifts)
+
+        # start_date is parsed at midnight, so each day's anchor is both the shift date and its midnight
+        day_starts = tuple(start_date + timedelta(days=offset) for offset in range(7))
 
-        for shift in existing_shifts:
-            Allocation.query.filter_by(shift_id=shift.id).delete()
+        # Load the week's shifts once instead of looking each one up per assignment
+        shifts_by_start = {}
+        for shift in Shift.query.filter(
+            Shift.schedule_id == schedule.id,
+            Shift.date >= day_starts[0],
+            Shift.date <= day_starts[-1]
+        ).order_by(Shift.id):
+            shifts_by_start.setdefault((shift.date, shift.start_time), shift)
 
+        staffed_shifts = []
         for entry in assignments:
             day_label = entry.get('day')
             time_slot = entry.get('time')
@@ -1125,41 +1131,50 @@ def save_schedule_assignments(schedule_type: str, start_date_str: str, end_date_
                 logger.warning(f"Skipping assignment with invalid day label: {day_label}")
                 continue
 
-            shift_date = start_date + timedelta(days=day_index)
+            shift_date = day_starts[day_index]
             start_hour = _parse_time_to_hour(time_slot, schedule_type)
             if start_hour is None:
                 logger.warning(f"Skipping assignment with invalid time slot: {time_slot}")
                 continue
 
-            shift_start = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=start_hour)
+            shift_start = shift_date + timedelta(hours=start_hour)
             shift_end_hour = _calculate_shift_end(schedule_type, start_hour)
-            shift_end = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=shift_end_hour)
-
-            shift = Shift.query.filter_by(
-                schedule_id=schedule.id,
-                date=shift_date,
-                start_time=shift_start
-            ).first()
+            shift_end = shift_date + timedelta(hours=shift_end_hour)
 
+            shift = shifts_by_start.get((shift_date, shift_start))
             if not shift:
                 shift = Shift(shift_date, shift_start, shift_end, schedule.id)
                 db.session.add(shift)
-                db.session.flush()
+                shifts_by_start[(shift_date, shift_start)] = shift
             else:
                 shift.end_time = shift_end
+            staffed_shifts.append((shift, staff_members))
 
+        # Insert all new shifts in one flush so their ids exist before allocating
+        db.session.flush()
+
+        # Look up the students and existing allocations once, then insert the new rows in one executemany
+        staff_ids = {str(staff['id']) for _, staff_members in staffed_shifts for staff in staff_members if staff.get('id')}
+        known_students = {username for (username,) in db.session.query(Student.username).filter(Student.username.in_(staff_ids))}
+        allocated = set(db.session.query(Allocation.shift_id, Allocation.username).filter(
+            Allocation.shift_id.in_({shift.id for shift, _ in staffed_shifts})
+        ))
+
+        new_allocations = []
+        for shift, staff_members in staffed_shifts:
             for staff in staff_members:
                 staff_id = staff.get('id')
                 if not staff_id:
                     continue
-                student = Student.query.filter_by(username=staff_id).first()
-                if not student:
+                username = str(staff_id)
+                if username not in known_students:
                     logger.warning(f"Skipping allocation for missing student id {staff_id}")
                     continue
-                existing_allocation = Allocation.query.filter_by(shift_id=shift.id, username=student.username).first()
-                if existing_allocation:
+                if (shift.id, username) in allocated:
                     continue
-                db.session.add(Allocation(student.username, shift.id, schedule.id))
+                allocated.add((shift.id, username))
+                new_allocations.append({'username': username, 'shift_id': shift.id, 'schedule_id': schedule.id})
+        bulk_create_allocations(new_allocations, commit=False)
 
         db.session.commit()
         return {'status': 'success', 'message': 'Schedule assignments saved successfully.'}, 200
@@ -1194,7 +1209,7 @@ def remove_staff_allocation(schedule_type: str, staff_id: Union[str, int], day_l
                 return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
             shift_date = schedule.start_date + timedelta(days=day_index)
-            shift_start = datetime.combine(shift_date.date(), datetime.min.time()) + timedelta(hours=start_hour)
+            shift_start = datetime.combine(shift_date.date(), time.min) + timedelta(hours=start_hour)
 
             target_shift = Shift.query.filter_by(
                 schedule_id=schedule.id,
@@ -1224,15 +1239,13 @@ def _normalize_time_object(time_value, context_description="time value"):
     Convert various time representations to datetime.time object.
     Handles time, datetime, and integer hour values.
     """
-    from datetime import time as dt_time, datetime
-    
-    if isinstance(time_value, dt_time):
+    if isinstance(time_value, time):
         return time_value
     elif isinstance(time_value, datetime):
         return time_value.time()
     elif isinstance(time_value, int):
         if 0 <= time_value <= 23:
-            return dt_time(time_value, 0)
+            return time(time_value, 0)
         else:
             raise ValueError(f"Invalid hour value: {time_value}")
     else:
@@ -1269,8 +1282,7 @@ def list_available_staff_for_slot(schedule_type: str, day_label: str, time_slot:
             return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
         # Convert hour to time object for proper comparison
-        from datetime import time as dt_time
-        requested_time = dt_time(hour, 0)
+        requested_time = time(hour, 0)
         
         available_staff = []
 
@@ -1313,8 +1325,7 @@ def check_staff_availability_for_slot(schedule_type: str, staff_id: Union[str, i
             return {'status': 'error', 'message': _ERROR_INVALID_TIME}, 400
 
         # Convert hour to time object for proper comparison
-        from datetime import time as dt_time
-        requested_time = dt_time(hour, 0)
+        requested_time = time(hour, 0)
         
         availability_slots = Availability.query.filter_by(username=staff.username, day_of_week=day_index).all()
         matching_slot = _check_time_slot_availability(availability_slots, requested_time)
@@ -75,13 +75,15 @@ def update_student_courses(student_id, course_codes):
             assistant_username=help_desk_assistant.username
         ).delete()
         
-        # Add new capabilities
+        # Add new capabilities, checking which courses exist with one query instead of one per course
+        known_codes = {
+            code for (code,) in db.session.query(Course.code).filter(Course.code.in_(course_codes))
+        } if course_codes else set()
         for course_code in course_codes:
-            course = Course.query.filter_by(code=course_code).first()
-            if course:
+            if course_code in known_codes:
                 capability = CourseCapability(
                     assistant_username=help_desk_assistant.username,
-                    course_code=course.code
+                    course_code=course_code
                 )
                 db.session.add(capability)
         
@@ -101,6 +103,14 @@ def _parse_time_string(time_str):
         return time_str
 
     value = str(time_str).strip()
+
+    # Zero-padded HH:MM / HH:MM:SS is the common case; fromisoformat parses it in C
+    if len(value) in (5, 8):
+        try:
+            return dt_time.fromisoformat(value)
+        except ValueError:
+            pass
+
     patterns = ['%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M:%S %p']
 
     for pattern in patterns:
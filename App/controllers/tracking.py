@@ -1,5 +1,5 @@
-from App.models import Student, HelpDeskAssistant, LabAssistant, Shift, Allocation, TimeEntry
-from App.database import db
+from App.models import Student, HelpDeskAssistant, Shift, Allocation, TimeEntry
+from App.database import db, no_expire_on_commit
 from datetime import datetime, timedelta, time
 from App.controllers.notification import (
     notify_clock_in,
@@ -8,7 +8,13 @@ from App.controllers.notification import (
 )
 from App.utils.time_utils import trinidad_now, convert_to_trinidad_time
 from App.utils.profile_images import resolve_profile_image
+from App.utils.fastfmt import fmt_clock_time, fmt_long_date
+from App.controllers.help_desk_assistant import get_active_help_desk_assistants
+from App.controllers.lab_assistant import get_active_lab_assistants
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def _resolve_profile_image_url(student):
@@ -87,13 +93,21 @@ def get_student_stats(username):
         'absences': absences
     }
 
+def _students_by_username(usernames):
+    """Load the students for many usernames with one query, keyed by username"""
+    if not usernames:
+        return {}
+    return {student.username: student for student in Student.query.filter(Student.username.in_(usernames))}
+
+
 def get_help_desk_assistant_stats():
     """Get attendance stats for all assistants"""
-    assistants = HelpDeskAssistant.query.filter_by(active=True).all()
+    # The student rows are joined in rather than fetched one assistant at a time
+    assistants = get_active_help_desk_assistants()
     
     stats = []
     for assistant in assistants:
-        student = Student.query.get(assistant.username)
+        student = assistant.student
         if student:
             assistant_stats = get_student_stats(assistant.username) or {
                 'semester': {'hours': 0},
@@ -113,11 +127,12 @@ def get_help_desk_assistant_stats():
 
 def get_lab_assistant_stats():
     """Get attendance stats for all assistants"""
-    assistants = LabAssistant.query.filter_by(active=True).all()
+    # The student rows are joined in rather than fetched one assistant at a time
+    assistants = get_active_lab_assistants()
     
     stats = []
     for assistant in assistants:
-        student = Student.query.get(assistant.username)
+        student = assistant.student
         if student:
             assistant_stats = get_student_stats(assistant.username) or {
                 'semester': {'hours': 0},
@@ -174,31 +189,10 @@ def get_today_shift(username):
             
             # If we have an active entry, we're clocked in
             if active_entry:
-                time_left = shift.end_time - now
-                hours = time_left.total_seconds() // 3600
-                minutes = (time_left.total_seconds() % 3600) // 60
-                
-                return {
-                    "date": shift.date.strftime("%d %B, %Y"),
-                    "start_time": shift.start_time.strftime("%I:%M %p"),
-                    "end_time": shift.end_time.strftime("%I:%M %p"),
-                    "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                    "status": "active",
-                    "starts_now": True,
-                    "time_until": f"{int(hours)} hours {int(minutes)} minutes",
-                    "shift_id": shift.id
-                }
-            else:
-                # Shift is happening now but we're not clocked in
-                return {
-                    "date": shift.date.strftime("%d %B, %Y"),
-                    "start_time": shift.start_time.strftime("%I:%M %p"),
-                    "end_time": shift.end_time.strftime("%I:%M %p"),
-                    "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                    "status": "active",
-                    "starts_now": False,
-                    "shift_id": shift.id
-                }
+                return _today_shift_details(shift, "active", starts_now=True,
+                                            time_until=_format_time_until(shift.end_time - now))
+            # Shift is happening now but we're not clocked in
+            return _today_shift_details(shift, "active", starts_now=False)
         
         # If no active shift, check for an upcoming shift today
         upcoming_shifts = db.session.query(Shift, Allocation)\
@@ -213,20 +207,7 @@ def get_today_shift(username):
         if upcoming_shifts:
             shift, allocation = upcoming_shifts[0]
             
-            # Calculate time until shift starts
-            time_until = shift.start_time - now
-            hours = time_until.total_seconds() // 3600
-            minutes = (time_until.total_seconds() % 3600) // 60
-            
-            return {
-                "date": shift.date.strftime("%d %B, %Y"),
-                "start_time": shift.start_time.strftime("%I:%M %p"),
-                "end_time": shift.end_time.strftime("%I:%M %p"),
-                "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                "status": "future",
-                "time_until": f"{int(hours)} hours {int(minutes)} minutes",
-                "shift_id": shift.id
-            }
+            return _today_shift_details(shift, "future", time_until=_format_time_until(shift.start_time - now))
         
         # Check for completed shifts today (already clocked out)
         completed_shifts = TimeEntry.query.filter(
@@ -242,15 +223,7 @@ def get_today_shift(username):
             shift = Shift.query.get(completed_entry.shift_id) if completed_entry.shift_id else None
             
             if shift:
-                return {
-                    "date": shift.date.strftime("%d %B, %Y"),
-                    "start_time": shift.start_time.strftime("%I:%M %p"),
-                    "end_time": shift.end_time.strftime("%I:%M %p"),
-                    "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                    "status": "completed",
-                    "shift_id": shift.id,
-                    "hours_worked": completed_entry.get_hours_worked()
-                }
+                return _today_shift_details(shift, "completed", hours_worked=completed_entry.get_hours_worked())
         
         # No shifts today
         return {
@@ -274,6 +247,24 @@ def get_today_shift(username):
             "status": "error"
         }
 
+def _today_shift_details(shift, status, **extra):
+    """Fields every get_today_shift result has for a real shift, plus the status-specific extras"""
+    start_time = fmt_clock_time(shift.start_time)
+    end_time = fmt_clock_time(shift.end_time)
+    return {
+        "date": fmt_long_date(shift.date),
+        "start_time": start_time,
+        "end_time": end_time,
+        "time": f"{start_time} to {end_time}",
+        "status": status,
+        "shift_id": shift.id,
+        **extra
+    }
+
+def _format_time_until(delta):
+    seconds = delta.total_seconds()
+    return f"{int(seconds // 3600)} hours {int((seconds % 3600) // 60)} minutes"
+
 def get_shift_attendance_records(shift_id=None, date_range=None):
     """Get attendance records for a specific shift or date range"""
     query = TimeEntry.query
@@ -286,9 +277,12 @@ def get_shift_attendance_records(shift_id=None, date_range=None):
         query = query.filter(TimeEntry.clock_in >= start_date, 
                              TimeEntry.clock_in <= end_date)
     
+    entries = query.all()
+    students = _students_by_username({entry.username for entry in entries})
+    
     records = []
-    for entry in query.all():
-        student = Student.query.get(entry.username)
+    for entry in entries:
+        student = students.get(entry.username)
         if student:
             record = {
                 'staff_id': entry.username,
@@ -312,50 +306,50 @@ def auto_complete_time_entries():
     try:
         now = trinidad_now()
         
-        # Find all active time entries
-        active_entries = TimeEntry.query.filter_by(status='active').all()
+        # Load all active entries together with their shift in one query
+        active_entries = db.session.query(TimeEntry, Shift).outerjoin(Shift, TimeEntry.shift_id == Shift.id).filter(
+            TimeEntry.status == 'active'
+        ).all()
         
         if not active_entries:
             return {"success": True, "message": "No active time entries found to auto-complete"}
-            
+        
+        # Only entries whose shift has already ended are completed
+        ended_entries = [(entry, shift) for entry, shift in active_entries if shift and now > shift.end_time]
+        if not ended_entries:
+            return {"success": True, "completed_count": 0}
+        
+        assistants = {
+            assistant.username: assistant
+            for assistant in HelpDeskAssistant.query.filter(
+                HelpDeskAssistant.username.in_({entry.username for entry, _ in ended_entries})
+            )
+        }
         completed_count = 0
         
-        for entry in active_entries:
-            # Get the associated shift
-            shift = Shift.query.get(entry.shift_id) if entry.shift_id else None
+        for entry, shift in ended_entries:
+            logger.debug("Auto-completing time entry %s for %s - shift ended at %s", entry.id, entry.username, shift.end_time)
+            entry.clock_out = shift.end_time
+            entry.status = 'completed'
             
-            # Skip if no shift is associated
-            if not shift:
-                continue
-                
-            # Check if the shift has ended
-            if now > shift.end_time:
-                print(f"Auto-completing time entry {entry.id} for {entry.username} - shift ended at {shift.end_time}")
-                entry.clock_out = shift.end_time
-                entry.status = 'completed'
-                
-                # Calculate hours worked
-                hours_worked = (entry.clock_out - entry.clock_in).total_seconds() / 3600
-                
-                # Update the help desk assistant's total hours
-                assistant = HelpDeskAssistant.query.get(entry.username)
-                if assistant:
-                    assistant.hours_worked += hours_worked
-                    db.session.add(assistant)
-                
-                # Create notification
-                shift_details = shift.formatted_time() if hasattr(shift, 'formatted_time') else f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
-                # Use the auto-completed parameter for the notification
-                notify_clock_out(entry.username, shift_details, auto_completed=True)
-                
-                db.session.add(entry)
-                completed_count += 1
-                
-                print(f"Auto-completed time entry {entry.id} for {entry.username} - {hours_worked:.2f} hours")
+            # Calculate hours worked
+            hours_worked = (entry.clock_out - entry.clock_in).total_seconds() / 3600
+            
+            # Update the help desk assistant's total hours
+            assistant = assistants.get(entry.username)
+            if assistant:
+                assistant.hours_worked += hours_worked
+            
+            # Queue the notification so every completion lands in the single commit below
+            shift_details = shift.formatted_time()
+            notify_clock_out(entry.username, shift_details, auto_completed=True, commit=False)
+            
+            completed_count += 1
+            
+            logger.debug("Auto-completed time entry %s for %s - %.2f hours", entry.id, entry.username, hours_worked)
         
-        if completed_count > 0:
-            db.session.commit()
-            print(f"Successfully auto-completed {completed_count} time entries")
+        db.session.commit()
+        logger.debug("Successfully auto-completed %s time entries", completed_count)
             
         return {
             "success": True,
@@ -443,11 +437,14 @@ def clock_in(username, shift_id=None):
         # Create new time entry
         time_entry = TimeEntry(username, now, shift_id, 'active')
         db.session.add(time_entry)
-        db.session.commit()
         
-        # Send notification
-        shift_details = shift.formatted_time() if hasattr(shift, 'formatted_time') else f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
-        notify_clock_in(username, shift_details)
+        # Send notification in the same commit as the entry
+        shift_details = shift.formatted_time()
+        notify_clock_in(username, shift_details, commit=False)
+        
+        # The new entry's id is read after the commit; keep it loaded instead of reselecting
+        with no_expire_on_commit():
+            db.session.commit()
         
         return {
             'success': True,
@@ -504,11 +501,12 @@ def clock_out(username):
             assistant.hours_worked += hours_worked
             db.session.add(assistant)
             
-        db.session.commit()
+        # Send notification in the same commit as the entry
+        shift_details = shift.formatted_time() if shift else f"{time_entry.clock_in.strftime('%I:%M %p')} shift"
+        notify_clock_out(username, shift_details, commit=False)
         
-        # Send notification
-        shift_details = shift.formatted_time() if shift and hasattr(shift, 'formatted_time') else f"{time_entry.clock_in.strftime('%I:%M %p')} shift"
-        notify_clock_out(username, shift_details)
+        with no_expire_on_commit():
+            db.session.commit()
         
         return {
             'success': True,
@@ -560,11 +558,12 @@ def check_and_complete_abandoned_entry(username):
                     assistant.hours_worked += hours_worked
                     db.session.add(assistant)
             
-            db.session.commit()
+            # Send notification in the same commit as the entry
+            shift_details = shift.formatted_time()
+            notify_clock_out(username, shift_details, auto_completed=True, commit=False)
             
-            # Send notification
-            shift_details = shift.formatted_time() if hasattr(shift, 'formatted_time') else f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
-            notify_clock_out(username, shift_details, auto_completed=True)
+            with no_expire_on_commit():
+                db.session.commit()
             
             return {
                 'success': True,
@@ -624,11 +623,11 @@ def mark_missed_shift(username, shift_id):
             'absent'
         )
         db.session.add(time_entry)
-        db.session.commit()
         
-        # Send notification
-        shift_details = shift.formatted_time() if hasattr(shift, 'formatted_time') else f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
-        notify_missed_shift(username, shift_details)
+        # Send notification in the same commit as the entry
+        shift_details = shift.formatted_time()
+        notify_missed_shift(username, shift_details, commit=False)
+        db.session.commit()
         
         return {
             'success': True,
@@ -718,21 +717,22 @@ def get_time_distribution(username):
             "hours": hours
         })
     
-    print(f"Time distribution data: {distribution}")  # Debug output
+    logger.debug("Time distribution data: %s", distribution)
     return distribution
 
 def generate_attendance_report(username=None, start_date=None, end_date=None, format='json'):
     """Generate an attendance report for one or all students"""
     try:
+        now = trinidad_now()
+
         # Set default date range if not provided
         if not start_date:
             # Default to start of current month
-            now = trinidad_now()
             start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
         if not end_date:
             # Default to now
-            end_date = trinidad_now()
+            end_date = now
         
         # Query time entries
         query = TimeEntry.query
@@ -743,12 +743,13 @@ def generate_attendance_report(username=None, start_date=None, end_date=None, fo
                              TimeEntry.clock_in <= end_date)
         
         time_entries = query.all()
+        students = _students_by_username({entry.username for entry in time_entries})
         
         # Group by student
         student_entries = {}
         for entry in time_entries:
             if entry.username not in student_entries:
-                student = Student.query.get(entry.username)
+                student = students.get(entry.username)
                 student_entries[entry.username] = {
                     'student_id': entry.username,
                     'student_name': student.get_name() if student else entry.username,
@@ -779,7 +780,7 @@ def generate_attendance_report(username=None, start_date=None, end_date=None, fo
                 'report': {
                     'start_date': start_date.strftime('%Y-%m-%d'),
                     'end_date': end_date.strftime('%Y-%m-%d'),
-                    'generated_at': trinidad_now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'generated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
                     'students': list(student_entries.values())
                 }
             }
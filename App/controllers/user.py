@@ -1,5 +1,6 @@
 from App.models import User, Student, HelpDeskAssistant, LabAssistant, CourseCapability, Availability, Notification, TimeEntry, Allocation, Request, RegistrationRequest
-from App.controllers import create_admin, create_student
+from App.controllers.admin import create_admin
+from App.controllers.student import create_student
 from App.database import db
 from sqlalchemy.exc import IntegrityError
 
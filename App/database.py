@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from sqlalchemy import event
@@ -15,10 +16,26 @@ def create_db():
 def init_db(app):
     db.init_app(app)
 
+@contextmanager
+def no_expire_on_commit():
+    """Keep instances loaded across commits in the block, for code that reads rows it just wrote"""
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield session
+    finally:
+        session.expire_on_commit = expire_on_commit
+
 @event.listens_for(Engine, "connect")
 def _enable_sqlite_fk(dbapi_connection, connection_record):
     # Only apply for the sqlite3 DBAPI (file or in-memory)
     if isinstance(dbapi_connection, SQLite3Connection):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.close()
\ No newline at end of file
+        # WAL lets readers run during a write and, with synchronous=NORMAL, syncs at checkpoints
+        # instead of on every commit; in-memory databases keep their own journal mode.
+        # This is the only place the journal mode is set: leaving WAL needs exclusive access
+        cursor.execute("PRAGMA journal_mode=WAL;")
+        cursor.execute("PRAGMA synchronous=NORMAL;")
+        cursor.close()
@@ -18,6 +18,8 @@ class Allocation(db.Model):
     __table_args__ = (
         db.Index('idx_allocation_schedule_student', 'schedule_id', 'username'),
         db.Index('idx_allocation_shift_student', 'shift_id', 'username'),
+        # Dashboard lookups start from the student, then narrow by schedule and join on shift
+        db.Index('idx_allocation_student_schedule', 'username', 'schedule_id', 'shift_id'),
     )
     
     # Relationships with proper cascade
@@ -1,5 +1,7 @@
 from App.database import db
 
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 class Availability(db.Model):
     __tablename__ = 'availability'
     
@@ -14,6 +16,8 @@ class Availability(db.Model):
         db.CheckConstraint('day_of_week >= 0 AND day_of_week <= 6', name='check_valid_day_of_week'),
         db.CheckConstraint('start_time < end_time', name='check_start_before_end'),
         db.Index('idx_availability_user_day', 'username', 'day_of_week'),
+        # Covers the day/time-window lookups in the availability controller
+        db.Index('idx_availability_day_time', 'day_of_week', 'start_time', 'end_time', 'username'),
     )
     
     # Relationships
@@ -26,8 +30,7 @@ class Availability(db.Model):
         self.end_time = end_time
     
     def get_json(self):
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        day_name = days[self.day_of_week] if 0 <= self.day_of_week < 7 else "Unknown"
+        day_name = _DAY_NAMES[self.day_of_week] if 0 <= self.day_of_week < 7 else "Unknown"
         
         return {
             'Availability ID': self.id,
@@ -46,10 +49,6 @@ class Availability(db.Model):
         shift_start = shift.start_time.time() if hasattr(shift.start_time, 'time') else shift.start_time
         shift_end = shift.end_time.time() if hasattr(shift.end_time, 'time') else shift.end_time
         
-        # Debug output
-        print(f"Checking availability: DB day={self.day_of_week}, shift day={shift_day}")
-        print(f"Checking time: DB time={self.start_time}-{self.end_time}, shift time={shift_start}-{shift_end}")
-        
         # Check if the availability window covers the shift
         return (self.day_of_week == shift_day and 
                 self.start_time <= shift_start and 
@@ -1,5 +1,7 @@
 from App.database import db
 
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 class RegistrationAvailability(db.Model):
     __tablename__ = 'registration_availability'
     
@@ -17,8 +19,7 @@ class RegistrationAvailability(db.Model):
         self.end_time = end_time
     
     def get_json(self):
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        day_name = days[self.day_of_week] if 0 <= self.day_of_week < 7 else "Unknown"
+        day_name = _DAY_NAMES[self.day_of_week] if 0 <= self.day_of_week < 7 else "Unknown"
         
         return {
             'day_of_week': self.day_of_week,
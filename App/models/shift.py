@@ -1,6 +1,7 @@
 from App.database import db
 from datetime import datetime
 from .shift_course_demand import ShiftCourseDemand
+from App.utils.fastfmt import fmt_shift_time_range
 
 class Shift(db.Model):
     __tablename__ = 'shift'
@@ -59,7 +60,7 @@ class Shift(db.Model):
         
     def formatted_time(self):
         """Return time in a human-friendly format like 10:00 am"""
-        return f"{self.start_time.strftime('%I:%M %p')} to {self.end_time.strftime('%I:%M %p')}"
+        return fmt_shift_time_range(self.start_time, self.end_time)
     
     def add_course_demand(self, course_code, tutors_required=2, weight=None):
         """Add or update course demand for this shift"""
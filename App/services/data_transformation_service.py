@@ -318,8 +318,8 @@ class DataTransformationService:
         Returns:
             Dictionary with statistics about the conversion
         """
-        from App.models import Allocation
         from App.database import db
+        from App.controllers.allocation import bulk_create_allocations
         
         stats = {
             'assignments_created': 0,
@@ -337,31 +337,26 @@ class DataTransformationService:
         db_shifts = list(shifts_mapping.values())
         clear_allocations_for_shifts(db_shifts)
         
-        # Create new allocations from the result
+        # Create new allocations from the result, consuming the shifts created for this run
+        allocation_rows = []
         for assistant_id, shift_id in result.assignments:
-            try:
-                db_shift = shifts_mapping.get(shift_id)
-                if not db_shift:
-                    logger.warning(f"No database shift found for scheduler shift {shift_id}")
-                    stats['assignments_failed'] += 1
-                    continue
-                
-                allocation = Allocation(
-                    username=assistant_id,
-                    shift_id=db_shift.id,
-                    schedule_id=schedule.id
-                )
-                
-                db.session.add(allocation)
-                stats['assignments_created'] += 1
-                
-            except Exception as e:
-                logger.error(f"Error creating allocation for {assistant_id} -> {shift_id}: {e}")
+            db_shift = shifts_mapping.get(shift_id)
+            if not db_shift:
+                logger.warning(f"No database shift found for scheduler shift {shift_id}")
                 stats['assignments_failed'] += 1
                 continue
+            
+            allocation_rows.append({
+                'username': assistant_id,
+                'shift_id': db_shift.id,
+                'schedule_id': schedule.id
+            })
+        
+        stats['assignments_created'] = len(allocation_rows)
         
-        # Commit all allocations
+        # Insert and commit all allocations at once
         try:
+            bulk_create_allocations(allocation_rows, commit=False)
             db.session.commit()
             logger.info(f"Successfully created {stats['assignments_created']} allocations")
         except Exception as e:
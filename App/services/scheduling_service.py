@@ -11,7 +11,6 @@ import logging
 
 from scheduler_lp import solve_helpdesk_schedule, SchedulerConfig
 from App.models import Schedule, Shift, HelpDeskAssistant, LabAssistant, Course
-from App.controllers.shift import create_shift
 from App.controllers.course import get_all_courses
 from App.database import db
 from App.utils.time_utils import trinidad_now
@@ -317,7 +316,6 @@ class SchedulingService:
         else:
             schedule.start_date = start_date
             schedule.end_date = end_date
-            db.session.add(schedule)
         
         db.session.flush()
         return schedule
@@ -364,20 +362,23 @@ class SchedulingService:
                     scheduler_shift.end
                 )
                 
-                # Create database shift
-                db_shift = create_shift(
+                # Create database shift; inserted with the rest below
+                shifts_mapping[scheduler_shift.id] = Shift(
                     shift_date.date(),
                     start_datetime,
                     end_datetime,
                     schedule.id
                 )
                 
-                shifts_mapping[scheduler_shift.id] = db_shift
-                
             except Exception as e:
                 logger.error(f"Error creating database shift for {scheduler_shift.id}: {e}")
                 continue
         
+        # Insert every shift in one flush rather than a commit per shift;
+        # the enclosing generation transaction commits them with the allocations
+        db.session.add_all(shifts_mapping.values())
+        db.session.flush()
+        
         logger.info(f"Created {len(shifts_mapping)} database shifts")
         return shifts_mapping
 
@@ -14,6 +14,7 @@ from App.database import db
 from App.models import User, Student, HelpDeskAssistant, Course, Schedule
 from App.controllers.user import create_user
 from App.controllers.admin import create_admin
+from App.views.api_v2.schedule import _HOURLY_SLOT_LABELS
 
 
 class TestAPIv2Endpoints:
@@ -218,6 +219,15 @@ class TestAPIv2Endpoints:
             assert data['success'] is False
             # Message might be in 'message' or 'error' field depending on API implementation
             assert 'message' in data or 'error' in data
+    
+    def test_hourly_slot_labels_match_strftime(self):
+        """The precomputed grid labels keep the strftime output they replaced"""
+        assert _HOURLY_SLOT_LABELS[9] == "09:00 AM to 10:00 AM"
+        assert sorted(_HOURLY_SLOT_LABELS) == list(range(9, 17))
+        for hour, label in _HOURLY_SLOT_LABELS.items():
+            start = datetime(2025, 1, 6, hour)
+            end = datetime(2025, 1, 6, hour + 1)
+            assert label == f"{start.strftime('%I:%M %p')} to {end.strftime('%I:%M %p')}"
 
 
 class TestAPIv2Performance:
@@ -268,4 +278,4 @@ class TestAPIv2Performance:
             
             # Should respond within 2 seconds
             assert duration < 2.0, f"{endpoint} took {duration:.2f}s"
-            assert response.status_code == 200
\ No newline at end of file
+            assert response.status_code == 200
@@ -1,15 +1,17 @@
-import os, tempfile, pytest, logging, unittest, warnings
+import os, shutil, tempfile, pytest, logging, unittest, warnings
 from unittest.mock import MagicMock, patch
 from werkzeug.security import check_password_hash, generate_password_hash
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager, create_access_token
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from sqlalchemy import inspect, text
 
 
 from App.main import create_app
 from App.database import db, create_db
 from App.models import *
 from App.controllers import *
+from App.controllers import schedule as schedule_controller, schedule_pulp as schedule_pulp_controller
 
 
 LOGGER = logging.getLogger(__name__)
@@ -62,18 +64,19 @@ class AuthIntegrationTests(unittest.TestCase):
     def tearDown(self):
         pass  # No database setup required for this class
 
-    def test_login_success(self):
-        User.query = MagicMock()
-        User.query.filter_by.return_value.first.return_value = self.mock_user
+    @patch('App.controllers.auth.db.session.get')
+    def test_login_success(self, mock_get):
+        mock_get.return_value = self.mock_user
 
         with self.app.app_context():
             token, user_type = login("a", "password")
+            mock_get.assert_called_once_with(User, "a")
             self.assertIsNotNone(token)
             self.assertEqual(user_type, "admin")
 
-    def test_login_failure(self):
-        User.query = MagicMock()
-        User.query.filter_by.return_value.first.return_value = None
+    @patch('App.controllers.auth.db.session.get')
+    def test_login_failure(self, mock_get):
+        mock_get.return_value = None
 
         with self.app.app_context():
             token, user_type = login("wronguser", "wrongpassword")
@@ -81,6 +84,64 @@ class AuthIntegrationTests(unittest.TestCase):
             self.assertIsNone(user_type)
 
 
+class AvailabilityIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        # Set up an in-memory SQLite database for testing
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_db()
+
+        create_student('student1', 'password1', 'BSc', 'First Student')
+        create_student('student2', 'password2', 'BSc', 'Second Student')
+        create_availability('student1', 0, time(9, 0), time(12, 0))
+        create_availability('student1', 2, time(13, 30), time(15, 0))
+        create_availability('student2', 0, time(11, 0), time(16, 0))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_batch_check_matches_single_checks(self):
+        queries = [
+            {'staff_id': staff_id, 'day': day, 'time': time_slot}
+            for staff_id in ('student1', 'student2', 'nobody')
+            for day in ('Monday', 'wednesday', 'Friday')
+            for time_slot in ('9:00 am', '11:00 am', '12:00 pm', '1:00 pm', '2:00 pm', '15', 'noon')
+        ]
+
+        results = batch_check_staff_availability(queries)
+
+        self.assertEqual(len(results), len(queries))
+        for query, result in zip(queries, results):
+            expected = check_staff_availability_for_time(query['staff_id'], query['day'], query['time'])
+            self.assertEqual(result['is_available'], expected, query)
+        self.assertTrue(any(result['is_available'] for result in results))
+
+    def test_range_time_slots_use_their_start_hour(self):
+        for time_slot in ('9:00 am to 10:00 am', '09:00 AM to 10:00 AM', '11:00 am - 12:00 pm'):
+            with self.subTest(time_slot=time_slot):
+                self.assertTrue(check_staff_availability_for_time('student1', 'Monday', time_slot))
+                results = batch_check_staff_availability([{'staff_id': 'student1', 'day': 'Monday', 'time': time_slot}])
+                self.assertTrue(results[0]['is_available'])
+        self.assertFalse(check_staff_availability_for_time('student1', 'Monday', '12:00 pm to 1:00 pm'))
+
+    def test_out_of_range_time_slots_are_rejected(self):
+        for time_slot in ('915', '25:00', '13:00 pm', '123', '1030', '230 pm', '9.30 pm'):
+            with self.subTest(time_slot=time_slot):
+                self.assertFalse(check_staff_availability_for_time('student1', 'Monday', time_slot))
+                results = batch_check_staff_availability([{'staff_id': 'student1', 'day': 'Monday', 'time': time_slot}])
+                self.assertFalse(results[0]['is_available'])
+
+    def test_batch_check_skips_incomplete_queries(self):
+        results = batch_check_staff_availability([
+            {'staff_id': 'student1', 'day': 'Monday'},
+            {'staff_id': 'student1', 'day': 'Monday', 'time': '10:00 am'},
+        ])
+
+        self.assertEqual(results, [{'staff_id': 'student1', 'day': 'Monday', 'time': '10:00 am', 'is_available': True}])
+
 class CourseIntegrationTests(unittest.TestCase):
     def setUp(self):
         # Set up an in-memory SQLite database for testing
@@ -152,7 +213,7 @@ class DashboardIntegrationTests(unittest.TestCase):
         patch.stopall()
 
     def test_get_dashboard_data_success(self):
-        Student.query.get = MagicMock(return_value=self.mock_student)
+        patch.object(Student, 'query').start().get.return_value = self.mock_student
 
         with patch('App.controllers.dashboard.get_next_shift', return_value={"date": "29 March, 2025", "time": "9:00 AM to 5:00 PM"}):
             with patch('App.controllers.dashboard.get_my_upcoming_shifts', return_value=[{"date": "29 Mar", "time": "9:00 AM to 5:00 PM"}]):
@@ -165,7 +226,7 @@ class DashboardIntegrationTests(unittest.TestCase):
         self.assertEqual(len(dashboard_data['my_shifts']), 1)
 
     def test_get_next_shift_active_shift(self):
-        self.mock_db_session.query.return_value.join.return_value.filter.return_value.first.return_value = (self.mock_allocation, self.mock_shift)
+        self.mock_db_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.first.return_value = self.mock_shift
 
         now = datetime(2025, 3, 29, 10, 0, 0)
         next_shift = get_next_shift("a", now)
@@ -174,7 +235,7 @@ class DashboardIntegrationTests(unittest.TestCase):
         self.assertTrue(next_shift['starts_now'])
 
     def test_get_next_shift_no_upcoming_shifts(self):
-        self.mock_db_session.query.return_value.join.return_value.filter.return_value.first.return_value = None
+        self.mock_db_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.first.return_value = None
 
         now = datetime(2025, 3, 29, 10, 0, 0)
         next_shift = get_next_shift("a", now)
@@ -183,7 +244,7 @@ class DashboardIntegrationTests(unittest.TestCase):
         self.assertFalse(next_shift['starts_now'])
 
     def test_get_my_upcoming_shifts(self):
-        self.mock_db_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = [(self.mock_allocation, self.mock_shift)]
+        self.mock_db_session.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = [(self.mock_shift, True)]
 
         today = datetime(2025, 3, 29)
         my_shifts = get_my_upcoming_shifts("a", today)
@@ -193,9 +254,8 @@ class DashboardIntegrationTests(unittest.TestCase):
 
     def test_get_full_schedule(self):
         self.mock_db_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [self.mock_shift]
-        Allocation.query = MagicMock()
-        Allocation.query.filter_by.return_value.all.return_value = [self.mock_allocation]
-        Student.query.get = MagicMock(return_value=self.mock_student)
+        patch.object(Allocation, 'query').start().filter_by.return_value.all.return_value = [self.mock_allocation]
+        patch.object(Student, 'query').start().get.return_value = self.mock_student
 
         today = datetime(2025, 3, 29)
         full_schedule = get_full_schedule(today)
@@ -263,17 +323,61 @@ class InitializeIntegrationTests(unittest.TestCase):
         self.assertEqual(len(courses), 1)
 
     def test_create_help_desk_assistants_handles_errors(self):
-        with patch('App.database.db.session.add', side_effect=Exception("Database error")):
+        with patch('App.database.db.session.bulk_insert_mappings', side_effect=Exception("Database error")):
             with self.assertLogs('App.controllers.initialize', level='ERROR') as log:
                 create_help_desk_assistants()
             self.assertTrue(any("Error creating help desk assistant" in message for message in log.output))
     
     def test_create_lab_assistants_handles_errors(self):
-        with patch('App.database.db.session.add', side_effect=Exception("Database error")):
+        with patch('App.database.db.session.bulk_insert_mappings', side_effect=Exception("Database error")):
             with self.assertLogs('App.controllers.initialize', level='ERROR') as log:
                 create_lab_assistants()
             self.assertTrue(any("Error creating lab assistant" in message for message in log.output))
 
+    def test_initialize_recreates_missing_indexes(self):
+        initialize()
+        db.session.execute(text('DROP INDEX idx_availability_day_time'))
+        db.session.execute(text('DROP INDEX idx_allocation_student_schedule'))
+        db.session.commit()
+
+        initialize()
+
+        inspector = inspect(db.engine)
+        self.assertIn('idx_availability_day_time', {index['name'] for index in inspector.get_indexes('availability')})
+        self.assertIn('idx_allocation_student_schedule', {index['name'] for index in inspector.get_indexes('allocation')})
+        self.assertIsNotNone(db.session.get(User, 'a'))
+
+class InitializeFileDatabaseTests(unittest.TestCase):
+    def setUp(self):
+        # Journal modes only apply to a file database; in-memory ones keep their own
+        self.db_dir = tempfile.mkdtemp()
+        db_path = os.path.join(self.db_dir, 'test.db')
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        create_db()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.db_dir)
+
+    def test_initialize_with_another_connection_open(self):
+        with db.engine.connect() as other:
+            other.exec_driver_sql('SELECT count(*) FROM course').scalar()
+            initialize()
+            admins = other.exec_driver_sql("SELECT count(*) FROM users WHERE username = 'a'").scalar()
+        self.assertEqual(admins, 1)
+
+    def test_initialize_restores_synchronous(self):
+        initialize()
+        # Every pooled connection is back at the NORMAL (1) level set on connect
+        with db.engine.connect() as first, db.engine.connect() as second:
+            levels = [connection.exec_driver_sql('PRAGMA synchronous').scalar() for connection in (first, second)]
+        self.assertEqual(levels, [1, 1])
+
+
 class NotificationIntegrationTests(unittest.TestCase):
     def setUp(self):
         # Set up an in-memory SQLite database for testing
@@ -300,6 +404,21 @@ class NotificationIntegrationTests(unittest.TestCase):
         self.assertEqual(notification.message, 'Test message')
         self.assertEqual(notification.notification_type, Notification.TYPE_REMINDER)
 
+    def test_create_notifications(self):
+        db.session.add(create_admin(username='otheruser', password='otherpass', role='helpdesk'))
+        db.session.commit()
+
+        notifications = create_notifications(['testuser', 'otheruser'], 'Schedule published', Notification.TYPE_SCHEDULE)
+
+        self.assertEqual([n.username for n in notifications], ['testuser', 'otheruser'])
+        stored = Notification.query.order_by(Notification.username).all()
+        self.assertEqual([n.username for n in stored], ['otheruser', 'testuser'])
+        for notification in stored:
+            self.assertIsNotNone(notification.id)
+            self.assertEqual(notification.message, 'Schedule published')
+            self.assertEqual(notification.notification_type, Notification.TYPE_SCHEDULE)
+            self.assertFalse(notification.is_read)
+
     '''def test_get_user_notifications(self):
         create_notification('testuser', 'Message 1', Notification.TYPE_REMINDER)
         create_notification('testuser', 'Message 2', Notification.TYPE_REMINDER)
@@ -776,6 +895,62 @@ class ScheduleIntegrationTests(unittest.TestCase):
         shifts = Shift.query.all()
         self.assertEqual(len(shifts), 0)
 
+    def _staffed_shift(self, day):
+        # A shift with an allocation, a course demand, a time entry and a request pointing at it
+        if db.session.get(Schedule, 1) is None:
+            db.session.add(Schedule(1, datetime(2025, 3, 24), datetime(2025, 3, 28), 'helpdesk'))
+        shift = Shift(day, day.replace(hour=10), day.replace(hour=11), 1)
+        db.session.add(shift)
+        db.session.flush()
+        time_entry = TimeEntry('816031001', day.replace(hour=10), shift.id, 'completed')
+        shift_request = Request('816031001', '10:00 am', 'Clash', shift_id=shift.id)
+        db.session.add_all([
+            Allocation('816031001', shift.id, 1),
+            ShiftCourseDemand(shift.id, 'COMP3602'),
+            time_entry,
+            shift_request,
+        ])
+        db.session.commit()
+        return shift.id, time_entry.id, shift_request.id
+
+    def test_clear_shifts_in_range_detaches_time_entries_and_removes_dependents(self):
+        for controller in (schedule_controller, schedule_pulp_controller):
+            with self.subTest(controller=controller.__name__):
+                day = datetime(2025, 3, 25)
+                shift_id, time_entry_id, request_id = self._staffed_shift(day)
+                kept_shift_id, _, _ = self._staffed_shift(datetime(2025, 3, 26))
+
+                controller.clear_shifts_in_range(1, day, day)
+                db.session.commit()
+
+                self.assertIsNone(db.session.get(Shift, shift_id))
+                self.assertEqual(Allocation.query.filter_by(shift_id=shift_id).count(), 0)
+                self.assertEqual(ShiftCourseDemand.query.filter_by(shift_id=shift_id).count(), 0)
+                self.assertIsNone(db.session.get(TimeEntry, time_entry_id).shift_id)
+                self.assertIsNone(db.session.get(Request, request_id).shift_id)
+
+                # Shifts outside the range keep their rows
+                self.assertIsNotNone(db.session.get(Shift, kept_shift_id))
+                self.assertEqual(Allocation.query.filter_by(shift_id=kept_shift_id).count(), 1)
+                self.assertEqual(ShiftCourseDemand.query.filter_by(shift_id=kept_shift_id).count(), 1)
+
+    def test_save_schedule_assignments_resave_does_not_duplicate_allocations(self):
+        assignments = [
+            {'day': 'TUE', 'time': '10:00 am', 'staff': [{'id': '816031001'}, {'id': '816031002'}]},
+            # The same slot listed twice must land on the same shift
+            {'day': 'TUE', 'time': '10:00 am', 'staff': [{'id': '816031001'}]},
+        ]
+        for controller in (schedule_controller, schedule_pulp_controller):
+            with self.subTest(controller=controller.__name__):
+                for _ in range(2):
+                    result, status = controller.save_schedule_assignments('helpdesk', '2025-03-24', '2025-03-28', assignments)
+                    self.assertEqual(status, 200, result)
+
+                shifts = Shift.query.filter_by(schedule_id=1, start_time=datetime(2025, 3, 25, 10)).all()
+                self.assertEqual(len(shifts), 1)
+                usernames = sorted(allocation.username for allocation in Allocation.query.filter_by(shift_id=shifts[0].id))
+                self.assertEqual(usernames, ['816031001', '816031002'])
+
 class TrackingIntegrationTests(unittest.TestCase):
     def setUp(self):
         # Set up an in-memory SQLite database for testing
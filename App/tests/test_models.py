@@ -491,6 +491,14 @@ class ShiftUnitTests(unittest.TestCase):
     def test_formatted_time(self):
         self.assertEqual(self.shift.formatted_time(), "09:00 AM to 12:00 PM")
 
+    def test_formatted_time_matches_strftime(self):
+        for start_hour in range(24):
+            for minute in (0, 5, 30, 59):
+                start_time = datetime(2023, 1, 1, start_hour, minute)
+                shift = Shift(date=datetime(2023, 1, 1), start_time=start_time, end_time=start_time + timedelta(hours=1))
+                expected = f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}"
+                self.assertEqual(shift.formatted_time(), expected)
+
     '''def test_add_course_demand(self):
 
         self.shift.course_demands = []
@@ -1,5 +1,11 @@
+import os
+import tempfile
 import unittest
+from datetime import time
 
+from werkzeug.security import check_password_hash
+
+from App.utils.csv_seed import STUDENT_COLUMNS, availability_rows, csv_rows, student_mapping
 from App.utils.profile_images import DEFAULT_PROFILE_IMAGE_URL, resolve_profile_image
 
 
@@ -16,3 +22,38 @@ class ProfileImageUtilsTests(unittest.TestCase):
     def test_resolve_profile_image_ignores_non_http_values(self):
         profile_data = {"image_filename": "uploads/profile_images/test.png"}
         self.assertEqual(resolve_profile_image(profile_data), DEFAULT_PROFILE_IMAGE_URL)
+
+
+class CsvSeedUtilsTests(unittest.TestCase):
+    def _write_csv(self, content):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as csvfile:
+            csvfile.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv_rows_picks_columns_by_header_in_requested_order(self):
+        path = self._write_csv("degree,username,password,name\nBSc,816000001,pass1,Ann\nMSc,816000002,pass2,Ben\n")
+        self.assertEqual(list(csv_rows(path, STUDENT_COLUMNS)), [
+            ('816000001', 'Ann', 'pass1', 'BSc'),
+            ('816000002', 'Ben', 'pass2', 'MSc'),
+        ])
+
+    def test_csv_rows_single_column_yields_one_tuples(self):
+        path = self._write_csv("code,name\nCOMP1600,Intro\nCOMP1601,Programming\n")
+        self.assertEqual(list(csv_rows(path, ('code',))), [('COMP1600',), ('COMP1601',)])
+
+    def test_csv_rows_empty_file_yields_nothing(self):
+        path = self._write_csv("")
+        self.assertEqual(list(csv_rows(path, ('code',))), [])
+
+    def test_availability_rows_parses_day_and_times(self):
+        path = self._write_csv("id,username,day_of_week,start_time,end_time\n1,816000001,2,09:00:00,10:30\n")
+        self.assertEqual(list(availability_rows(path)), [('816000001', 2, time(9, 0), time(10, 30))])
+
+    def test_student_mapping_hashes_password(self):
+        mapping = student_mapping('816000001', 'Ann', 'pass1', 'BSc')
+        self.assertEqual({key: mapping[key] for key in ('username', 'name', 'degree')},
+                         {'username': '816000001', 'name': 'Ann', 'degree': 'BSc'})
+        self.assertNotEqual(mapping['password'], 'pass1')
+        self.assertTrue(check_password_hash(mapping['password'], 'pass1'))
@@ -0,0 +1,51 @@
+"""Readers for the sample csv files used to seed the database.
+
+Rows are yielded as plain tuples of the requested columns, looked up by
+header position once per file, rather than as a dict per row.
+"""
+import csv
+from datetime import time
+from operator import itemgetter
+
+from werkzeug.security import generate_password_hash
+
+# Assistant csv columns that make up a Student row, in student_mapping's argument order
+STUDENT_COLUMNS = ('username', 'name', 'password', 'degree')
+
+_AVAILABILITY_COLUMNS = ('username', 'day_of_week', 'start_time', 'end_time')
+
+
+def csv_rows(path, columns):
+    """Yield a tuple of the named columns for each row of a csv"""
+    with open(path, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        indices = [header.index(column) for column in columns]
+        if len(indices) == 1:
+            # itemgetter with a single index returns the bare value rather than a tuple
+            index = indices[0]
+            for row in reader:
+                yield (row[index],)
+            return
+        pick = itemgetter(*indices)
+        for row in reader:
+            yield pick(row)
+
+
+def availability_rows(path):
+    """Yield (username, day_of_week, start_time, end_time) for each row of an availability csv"""
+    for username, day_of_week, start_time, end_time in csv_rows(path, _AVAILABILITY_COLUMNS):
+        # The csv stores HH:MM[:SS], which time.fromisoformat parses directly
+        yield username, int(day_of_week), time.fromisoformat(start_time), time.fromisoformat(end_time)
+
+
+def student_mapping(username, name, password, degree):
+    """Column values for a Student row read from one of the sample csv files"""
+    return {
+        'username': username,
+        'password': generate_password_hash(password),
+        'degree': degree,
+        'name': name,
+    }
@@ -0,0 +1,29 @@
+"""f-string replacements for the strftime patterns used when rendering shifts.
+
+Each helper produces exactly what the quoted strftime pattern does in the C
+locale, without re-parsing a format string on every call.
+"""
+
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+_MONTH_ABBRS = tuple(month[:3] for month in _MONTHS)
+
+
+def fmt_long_date(d):
+    """Same output as d.strftime("%d %B, %Y")"""
+    return f"{d.day:02d} {_MONTHS[d.month - 1]}, {d.year}"
+
+
+def fmt_shift_date(d):
+    """Same output as d.strftime("%d %b")"""
+    return f"{d.day:02d} {_MONTH_ABBRS[d.month - 1]}"
+
+
+def fmt_clock_time(t):
+    """Same output as t.strftime("%I:%M %p")"""
+    return f"{t.hour % 12 or 12:02d}:{t.minute:02d} {'AM' if t.hour < 12 else 'PM'}"
+
+
+def fmt_shift_time_range(start, end):
+    """Same output as f"{start:%I:%M %p} to {end:%I:%M %p}" """
+    return f"{fmt_clock_time(start)} to {fmt_clock_time(end)}"
@@ -1,6 +1,6 @@
 from flask import request, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta, timezone, time
 import logging
 from io import BytesIO
 import tempfile
@@ -13,12 +13,20 @@ from App.middleware import admin_required
 from App.database import db
 from App.models import Schedule, Shift, Allocation, Student
 from App.utils.profile_images import resolve_profile_image
+from App.utils.fastfmt import fmt_shift_time_range
 
 # Constants for cleaner code
 UNKNOWN_ERROR_MSG = "Unknown error"
 NO_RESPONSE_MSG = "No response"
 MAX_BATCH_QUERIES = 500
 MAX_FUTURE_DAYS = 365
+# Day name to weekday index mapping
+DAY_INDEX = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2,
+    'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6
+}
+# Display labels for the hourly help desk grid, e.g. "09:00 AM to 10:00 AM"
+_HOURLY_SLOT_LABELS = {hour: fmt_shift_time_range(time(hour), time(hour + 1)) for hour in range(9, 17)}
 
 
 def _get_current_timestamp():
@@ -213,7 +221,8 @@ def get_current_schedule():
             "days": []
         }
 
-        # Group shifts by weekday index using pre-loaded data
+        # Group shifts by weekday index and start hour using pre-loaded data, so each
+        # grid slot below is a dict lookup rather than a scan of the day's shifts
         shifts_by_day = {}
         for shift in schedule.shifts:
             day_idx = shift.date.weekday()
@@ -223,8 +232,11 @@ def get_current_schedule():
             if schedule_type == 'lab' and day_idx > 5:
                 continue
 
-            if day_idx not in shifts_by_day:
-                shifts_by_day[day_idx] = []
+            day_slots = shifts_by_day.setdefault(day_idx, {})
+            hour = shift.start_time.hour
+            # The first shift in a slot wins, as the grid shows one shift per slot
+            if hour in day_slots:
+                continue
 
             # Use pre-loaded data instead of separate queries
             assistants = []
@@ -237,14 +249,14 @@ def get_current_schedule():
                         "profile_image_url": resolve_profile_image(getattr(alloc.student, 'profile_data', None))
                     })
 
-            shifts_by_day[day_idx].append({
+            day_slots[hour] = {
                 "shift_id": shift.id,
                 # Keep classic-style time formatting ('to') to match existing UI usage
-                "time": f"{shift.start_time.strftime('%I:%M %p')} to {shift.end_time.strftime('%I:%M %p')}",
-                "hour": shift.start_time.hour,
+                "time": shift.formatted_time(),
+                "hour": hour,
                 "date": shift.date.isoformat(),
                 "assistants": assistants
-            })
+            }
 
         days = []
         if schedule_type == 'lab':
@@ -258,11 +270,11 @@ def get_current_schedule():
 
             for day_idx in range(6):
                 day_date = schedule.start_date + timedelta(days=day_idx)
-                actual_shifts = shifts_by_day.get(day_idx, [])
+                day_slots = shifts_by_day.get(day_idx, {})
                 day_shifts = []
                 for block in lab_blocks:
                     hour = block["hour"]
-                    match = next((s for s in actual_shifts if s["hour"] == hour), None)
+                    match = day_slots.get(hour)
                     if match:
                         day_shifts.append({
                             "shift_id": match["shift_id"],
@@ -291,29 +303,23 @@ def get_current_schedule():
             day_codes = ["MON", "TUE", "WED", "THUR", "FRI"]
             for day_idx in range(5):
                 day_date = schedule.start_date + timedelta(days=day_idx)
-                actual_shifts = shifts_by_day.get(day_idx, [])
+                day_slots = shifts_by_day.get(day_idx, {})
                 day_shifts = []
                 for hour in range(9, 17):
-                    match = next((s for s in actual_shifts if s["hour"] == hour), None)
+                    match = day_slots.get(hour)
                     if match:
-                        # Reformat time to a normalized display with 'to'
-                        start_label = datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0).strftime('%I:%M %p')
-                        end_label = (datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0) + timedelta(hours=1)).strftime('%I:%M %p')
-                        time_label = f"{start_label} to {end_label}"
+                        # Normalized display with 'to'
                         day_shifts.append({
                             "shift_id": match["shift_id"],
-                            "time": time_label,
+                            "time": _HOURLY_SLOT_LABELS[hour],
                             "hour": hour,
                             "date": match["date"],
                             "assistants": match["assistants"],
                         })
                     else:
-                        start_label = datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0).strftime('%I:%M %p')
-                        end_label = (datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0) + timedelta(hours=1)).strftime('%I:%M %p')
-                        time_label = f"{start_label} to {end_label}"
                         day_shifts.append({
                             "shift_id": None,
-                            "time": time_label,
+                            "time": _HOURLY_SLOT_LABELS[hour],
                             "hour": hour,
                             "date": day_date.isoformat(),
                             "assistants": [],
@@ -452,12 +458,6 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
     assignments_processed = 0
     errors = []
     
-    # Day name to weekday index mapping
-    day_mapping = {
-        'monday': 0, 'tuesday': 1, 'wednesday': 2, 
-        'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6
-    }
-    
     for assignment in assignments:
         try:
             day = assignment.get('day', '').lower().strip()
@@ -467,11 +467,11 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
             
             if not day or not time_str or not staff_assignments:
                 if day and time_str:  # Only log if we have basic info
-                    logger.debug(f"Skipping assignment for {day} {time_str} - no staff assigned")
+                    logger.debug("Skipping assignment for %s %s - no staff assigned", day, time_str)
                 continue
             
             # Convert day name to weekday index
-            day_idx = day_mapping.get(day)
+            day_idx = DAY_INDEX.get(day)
             if day_idx is None:
                 errors.append({
                     "assignment": assignment,
@@ -503,6 +503,9 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
                 # If day is beyond end date, skip
                 continue
                 
+            # Midnight of the target day plus the hour, computed once for both lookups below
+            hour_start = datetime.combine(target_date, datetime.min.time()) + timedelta(hours=hour)
+            
             # Find the matching shift
             matching_shift = Shift.query.filter(
                 Shift.schedule_id == schedule.id,
@@ -516,8 +519,8 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
                     Shift.schedule_id == schedule.id,
                     Shift.date == target_date
                 ).filter(
-                    Shift.start_time >= datetime.combine(target_date, datetime.min.time()) + timedelta(hours=hour),
-                    Shift.start_time < datetime.combine(target_date, datetime.min.time()) + timedelta(hours=hour+1)
+                    Shift.start_time >= hour_start,
+                    Shift.start_time < hour_start + timedelta(hours=1)
                 ).first()
                 
             if not matching_shift:
@@ -558,7 +561,7 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
                 ).first()
                 
                 if existing_allocation:
-                    logger.debug(f"Allocation already exists for {staff_id} on shift {matching_shift.id}")
+                    logger.debug("Allocation already exists for %s on shift %s", staff_id, matching_shift.id)
                     staff_processed += 1
                     continue
                 
@@ -571,7 +574,7 @@ def _process_schedule_assignments(schedule, assignments, start_date, end_date):
                 db.session.add(new_allocation)
                 staff_processed += 1
                 
-                logger.debug(f"Created allocation: {staff_id} -> shift {matching_shift.id} ({day} {time_str})")
+                logger.debug("Created allocation: %s -> shift %s (%s %s)", staff_id, matching_shift.id, day, time_str)
             
             if staff_processed > 0:
                 assignments_processed += 1
@@ -75,16 +75,20 @@ def time_tracking():
     # Auto-complete any expired sessions first
     auto_complete_time_entries()
     
+    # One clock reading for every default and label below, so they cannot straddle midnight
+    now = datetime.now()
+    week_ago = now - timedelta(days=7)
+    
     # Get student stats
     stats = get_student_stats(username) or {
-        'daily': {'hours': 0, 'date': datetime.now().strftime('%Y-%m-%d'), 'date_range': datetime.now().strftime("%d %b, %Y")},
+        'daily': {'hours': 0, 'date': now.strftime('%Y-%m-%d'), 'date_range': now.strftime("%d %b, %Y")},
         'weekly': {
             'hours': 0, 
-            'start_date': (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'), 
-            'end_date': datetime.now().strftime('%Y-%m-%d'),
-            'date_range': f"Week {datetime.now().isocalendar()[1]}, {(datetime.now() - timedelta(days=7)).strftime('%b %d')} - {datetime.now().strftime('%b %d')}"
+            'start_date': week_ago.strftime('%Y-%m-%d'), 
+            'end_date': now.strftime('%Y-%m-%d'),
+            'date_range': f"Week {now.isocalendar()[1]}, {week_ago.strftime('%b %d')} - {now.strftime('%b %d')}"
         },
-        'monthly': {'hours': 0, 'month': datetime.now().strftime('%B %Y'), 'date_range': datetime.now().strftime('%B %Y')},
+        'monthly': {'hours': 0, 'month': now.strftime('%B %Y'), 'date_range': now.strftime('%B %Y')},
         'semester': {'hours': 0, 'date_range': 'Current Semester'},
         'absences': 0
     }
@@ -99,8 +103,6 @@ def time_tracking():
     time_distribution = get_time_distribution(username)
     
     # Format stats for display
-    now = datetime.now()
-    
     daily = {
         "date_range": stats['daily'].get('date_range', now.strftime("%d %b, %I:%M %p")),
         "hours": f"{stats['daily']['hours']:.1f}"
@@ -273,13 +275,16 @@ def profile():
     
     # Get stats
 
-    stats = get_student_stats(username) or {
-        'daily': {'hours': 0, 'date': trinidad_now().strftime('%Y-%m-%d')},
-        'weekly': {'hours': 0, 'start_date': (trinidad_now() - datetime.timedelta(days=7)).strftime('%Y-%m-%d'), 'end_date': trinidad_now().strftime('%Y-%m-%d')},
-        'monthly': {'hours': 0, 'month': trinidad_now().strftime('%B %Y')},
-        'semester': {'hours': 0},
-        'absences': 0
-    }
+    stats = get_student_stats(username)
+    if not stats:
+        now = trinidad_now()
+        stats = {
+            'daily': {'hours': 0, 'date': now.strftime('%Y-%m-%d')},
+            'weekly': {'hours': 0, 'start_date': (now - timedelta(days=7)).strftime('%Y-%m-%d'), 'end_date': now.strftime('%Y-%m-%d')},
+            'monthly': {'hours': 0, 'month': now.strftime('%B %Y')},
+            'semester': {'hours': 0},
+            'absences': 0
+        }
     
     # Get profile data from student record for image/contact info
     stored_profile_data = {}
@@ -11,3 +11,32 @@ worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
 loglevel = os.environ.get("LOG_LEVEL", "info")
 accesslog = '-'  # stdout
 errorlog = '-'   # stderr
+
+
+def post_fork(server, worker):
+    # gevent only helps if database waits yield to other greenlets
+    if worker_class == "gevent":
+        _make_psycopg2_green()
+
+
+def _make_psycopg2_green():
+    """Let psycopg2 wait on the socket through gevent instead of blocking the worker."""
+    try:
+        from psycopg2 import extensions, OperationalError
+        from gevent.socket import wait_read, wait_write
+    except ImportError:
+        return
+
+    def gevent_wait_callback(conn, timeout=None):
+        while True:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(conn.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(conn.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f"Bad result from poll: {state!r}")
+
+    extensions.set_wait_callback(gevent_wait_callback)
@@ -123,16 +123,16 @@ class Shift:
             raise ValueError("min_staff must be non-negative")
         if self.max_staff is not None and self.max_staff < self.min_staff:
             raise ValueError("max_staff cannot be smaller than min_staff")
+        # Model construction reads the duration once per assistant, so work it out up front
+        base_day = date(2000, 1, 1)
+        delta = datetime.combine(base_day, self.end) - datetime.combine(base_day, self.start)
+        object.__setattr__(self, "_duration_hours", delta.total_seconds() / 3600.0)
 
     @property
     def duration_hours(self) -> float:
         """Return the shift duration in hours."""
 
-        base_day = date(2000, 1, 1)
-        start_dt = datetime.combine(base_day, self.start)
-        end_dt = datetime.combine(base_day, self.end)
-        delta = end_dt - start_dt
-        return delta.total_seconds() / 3600.0
+        return getattr(self, "_duration_hours")
 
 
 @dataclass
@@ -416,13 +416,14 @@ def _build_objective_terms(
 ) -> List[pulp.LpAffineExpression]:
     objective_terms: List[pulp.LpAffineExpression] = []
 
-    # Course shortfall penalties
-    for (shift_id, course_code), var in course_shortfall_vars.items():
-        shift = next(shift for shift in shifts if shift.id == shift_id)
-        weight = next(
-            demand.weight for demand in shift.course_demands if demand.course_code.upper() == course_code
-        )
-        objective_terms.append(config.course_shortfall_penalty * weight * var)
+    # Course shortfall penalties, with each demand's weight read from a map built in one
+    # pass rather than searched for in the shift list per variable
+    demand_weights: Dict[Tuple[str, str], float] = {}
+    for shift in shifts:
+        for demand in shift.course_demands:
+            demand_weights.setdefault((shift.id, demand.course_code.upper()), demand.weight)
+    for key, var in course_shortfall_vars.items():
+        objective_terms.append(config.course_shortfall_penalty * demand_weights[key] * var)
 
     # Staff shortfall penalties
     for var in staff_shortfall_vars.values():
@@ -5,19 +5,20 @@ from flask.cli import with_appcontext, AppGroup
 from datetime import datetime
 
 from App.database import db, get_migrate
-from App.models import User
+from App.models import User, Student, HelpDeskAssistant, LabAssistant, CourseCapability, Availability
 from App.main import create_app
 from App.controllers import (create_user, get_all_users_json, get_all_users, initialize, 
     generate_help_desk_schedule, generate_lab_schedule)
-
-import csv
+from App.controllers.course import create_course, get_all_course_codes
+from App.utils.csv_seed import STUDENT_COLUMNS, availability_rows, csv_rows, student_mapping
 
 app = create_app()
 migrate = get_migrate(app)
 
 @app.cli.command("init", help="Creates and initializes the database")
-def init():
-    initialize()
+@click.option('--force', is_flag=True, help='Drop and recreate every table even if the schema is current')
+def init(force):
+    initialize(force=force)
     print('database intialized')
 
 # User Commands
@@ -179,98 +180,94 @@ app.cli.add_command(schedule_cli)
 # Seed Helpers
 
 def _seed_courses(limit=None):
-    from App.controllers.course import create_course, get_all_course_codes
     added = 0
     existing = set(get_all_course_codes())
-    with open('sample/courses.csv', newline='') as f:
-        for row in csv.DictReader(f):
-            if row['code'] in existing:
-                continue
-            create_course(code=row['code'], name=row['name'])
-            added += 1
-            existing.add(row['code'])
-            if limit and added >= limit:
-                break
+    for code, name in csv_rows('sample/courses.csv', ('code', 'name')):
+        if code in existing:
+            continue
+        create_course(code=code, name=name, commit=False)
+        added += 1
+        existing.add(code)
+        if limit and added >= limit:
+            break
+    # One INSERT batch and commit for all the missing courses
+    db.session.commit()
     return added
 
 def _seed_helpdesk(count=None):
-    from App.controllers.student import create_student, get_student
-    from App.controllers.help_desk_assistant import create_help_desk_assistant, get_help_desk_assistant
-    from App.controllers.availability import create_availability
-    from App.controllers.course import create_course_capability
-    from datetime import time
-
-    with open('sample/help_desk_assistants.csv', newline='') as f:
-        rows = list(csv.DictReader(f))
+    rows = list(csv_rows('sample/help_desk_assistants.csv', STUDENT_COLUMNS))
     if count:
         rows = rows[:count]
-    usernames = {r['username'] for r in rows}
-
-    created_students = 0
-    created_assistants = 0
-    for r in rows:
-        if not get_student(r['username']):
-            create_student(r['username'], r['password'], r['degree'], r['name'])
-            created_students += 1
-        if not get_help_desk_assistant(r['username']):
-            create_help_desk_assistant(r['username'])
-            created_assistants += 1
-
-    with open('sample/help_desk_assistants_availability.csv', newline='') as f:
-        for row in csv.DictReader(f):
-            if row['username'] in usernames:
-                sh, sm, ss = map(int, row['start_time'].split(':'))
-                eh, em, es = map(int, row['end_time'].split(':'))
-                # Skip creation if availability already exists for that exact slot
-                from App.models import Availability
-                exists = Availability.query.filter_by(username=row['username'], day_of_week=int(row['day_of_week']), start_time=f"{sh:02d}:{sm:02d}:{ss:02d}", end_time=f"{eh:02d}:{em:02d}:{es:02d}").first()
-                if not exists:
-                    create_availability(row['username'], int(row['day_of_week']), time(sh, sm, ss), time(eh, em, es))
-
-    with open('sample/help_desk_assistants_courses.csv', newline='') as f:
-        for row in csv.DictReader(f):
-            if row['username'] in usernames:
-                from App.models import CourseCapability
-                exists = CourseCapability.query.filter_by(assistant_username=row['username'], course_code=row['code']).first()
-                if not exists:
-                    create_course_capability(row['username'], row['code'])
-
-    return {'students': created_students, 'assistants': created_assistants}
+    usernames = {row[0] for row in rows}
+
+    # Insert the missing students and assistants with one executemany each
+    existing_students = _existing_usernames(Student, usernames)
+    existing_assistants = _existing_usernames(HelpDeskAssistant, usernames)
+    new_students = [student_mapping(*row) for row in rows if row[0] not in existing_students]
+    new_assistants = [
+        {'username': username, 'rate': 35.00 if degree == 'MSc' else 20.00}
+        for username, _, _, degree in rows if username not in existing_assistants
+    ]
+    db.session.bulk_insert_mappings(Student, new_students)
+    db.session.bulk_insert_mappings(HelpDeskAssistant, new_assistants)
+
+    _seed_availability('sample/help_desk_assistants_availability.csv', usernames)
+
+    existing_capabilities = set(
+        db.session.query(CourseCapability.assistant_username, CourseCapability.course_code)
+        .filter(CourseCapability.assistant_username.in_(usernames))
+    )
+    new_capabilities = []
+    for key in csv_rows('sample/help_desk_assistants_courses.csv', ('username', 'code')):
+        if key[0] in usernames and key not in existing_capabilities:
+            existing_capabilities.add(key)
+            new_capabilities.append({'assistant_username': key[0], 'course_code': key[1]})
+    db.session.bulk_insert_mappings(CourseCapability, new_capabilities)
+
+    db.session.commit()
+    return {'students': len(new_students), 'assistants': len(new_assistants)}
 
 
 def _seed_lab(count=None):
-    from App.controllers.student import create_student, get_student
-    from App.controllers.lab_assistant import create_lab_assistant, get_lab_assistant
-    from App.controllers.availability import create_availability
-    from datetime import time
-
-    with open('sample/lab_assistants.csv', newline='') as f:
-        rows = list(csv.DictReader(f))
+    rows = list(csv_rows('sample/lab_assistants.csv', STUDENT_COLUMNS + ('experience',)))
     if count:
         rows = rows[:count]
-    usernames = {r['username'] for r in rows}
-
-    created_students = 0
-    created_lab = 0
-    for r in rows:
-        if not get_student(r['username']):
-            create_student(r['username'], r['password'], r['degree'], r['name'])
-            created_students += 1
-        if not get_lab_assistant(r['username']):
-            create_lab_assistant(r['username'], r.get('experience', ''))
-            created_lab += 1
-
-    with open('sample/lab_assistants_availability.csv', newline='') as f:
-        for row in csv.DictReader(f):
-            if row['username'] in usernames:
-                sh, sm, ss = map(int, row['start_time'].split(':'))
-                eh, em, es = map(int, row['end_time'].split(':'))
-                from App.models import Availability
-                exists = Availability.query.filter_by(username=row['username'], day_of_week=int(row['day_of_week']), start_time=f"{sh:02d}:{sm:02d}:{ss:02d}", end_time=f"{eh:02d}:{em:02d}:{es:02d}").first()
-                if not exists:
-                    create_availability(row['username'], int(row['day_of_week']), time(sh, sm, ss), time(eh, em, es))
-
-    return {'students': created_students, 'lab_assistants': created_lab}
+    usernames = {row[0] for row in rows}
+
+    existing_students = _existing_usernames(Student, usernames)
+    existing_lab = _existing_usernames(LabAssistant, usernames)
+    new_students = [student_mapping(*row[:4]) for row in rows if row[0] not in existing_students]
+    new_lab = [
+        {'username': row[0], 'experience': bool(int(row[4])), 'active': True}
+        for row in rows if row[0] not in existing_lab
+    ]
+    db.session.bulk_insert_mappings(Student, new_students)
+    db.session.bulk_insert_mappings(LabAssistant, new_lab)
+
+    _seed_availability('sample/lab_assistants_availability.csv', usernames)
+
+    db.session.commit()
+    return {'students': len(new_students), 'lab_assistants': len(new_lab)}
+
+
+def _existing_usernames(model, usernames):
+    """The subset of usernames that already have a row in model's table"""
+    return {username for (username,) in db.session.query(model.username).filter(model.username.in_(usernames))}
+
+
+def _seed_availability(path, usernames):
+    """Insert the availability rows in path for usernames, skipping slots that already exist"""
+    existing = set(
+        db.session.query(Availability.username, Availability.day_of_week, Availability.start_time, Availability.end_time)
+        .filter(Availability.username.in_(usernames))
+    )
+    availabilities = []
+    for slot in availability_rows(path):
+        if slot[0] in usernames and slot not in existing:
+            existing.add(slot)
+            availabilities.append(dict(zip(('username', 'day_of_week', 'start_time', 'end_time'), slot)))
+    if availabilities:
+        db.session.execute(Availability.__table__.insert(), availabilities)
 
 seed_cli = AppGroup('seed', help='Seed sample data partially')
 
@@ -295,12 +292,8 @@ def seed_lab_cmd(count):
 @seed_cli.command('reset')
 @click.option('--type', type=click.Choice(['helpdesk', 'lab', 'all']), default='all', help='Which sample data to remove')
 def seed_reset_cmd(type):
-    from App.database import db
-    from App.models import Student, HelpDeskAssistant, CourseCapability, Availability
-
     def _usernames_from_csv(path):
-        with open(path, newline='') as f:
-            return {r['username'] for r in csv.DictReader(f)}
+        return {username for (username,) in csv_rows(path, ('username',))}
 
     targets = set()
     if type in ('helpdesk', 'all'):
@@ -312,16 +305,13 @@ def seed_reset_cmd(type):
     del_avail = Availability.__table__.delete().where(Availability.username.in_(list(targets)))
     res_a = db.session.execute(del_avail)
     # Delete course capabilities
-    from App.models import CourseCapability as CC
-    del_caps = CC.__table__.delete().where(CC.assistant_username.in_(list(targets)))
+    del_caps = CourseCapability.__table__.delete().where(CourseCapability.assistant_username.in_(list(targets)))
     res_c = db.session.execute(del_caps)
     # Delete assistants
-    from App.models import HelpDeskAssistant as HDA
-    del_hda = HDA.__table__.delete().where(HDA.username.in_(list(targets)))
+    del_hda = HelpDeskAssistant.__table__.delete().where(HelpDeskAssistant.username.in_(list(targets)))
     res_h = db.session.execute(del_hda)
     # Delete students (and users via inheritance)
-    from App.models import Student as ST
-    del_students = ST.__table__.delete().where(ST.username.in_(list(targets)))
+    del_students = Student.__table__.delete().where(Student.username.in_(list(targets)))
     res_s = db.session.execute(del_students)
 
     db.session.commit()